@@ -1,17 +1,29 @@
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+try:  # Optional dependency
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-def get_provider_endpoints() -> Dict[str, str]:
-    """Map provider identifiers to their base URLs."""
-    return {
+# Read-only so callers sharing the constant cannot mutate it.
+PROVIDER_ENDPOINTS: Mapping[str, str] = MappingProxyType(
+    {
         "openai": "https://api.openai.com/v1/images",
         "banana": "https://banana.dev/api",
         "stability": "https://api.stability.ai/v1",
     }
+)
+
+
+def get_provider_endpoints() -> Mapping[str, str]:
+    """Map provider identifiers to their base URLs."""
+    return PROVIDER_ENDPOINTS
 
 
 FUSION_WEIGHTS = {
@@ -27,6 +39,22 @@ FUSION_WEIGHTS = {
     "quality_score": 0.3,
 }
 
+# 融合模块的固定顺序，与 FUSION_WEIGHTS_VEC 的列一一对应
+MODULE_ORDER: Tuple[str, ...] = (
+    "color_score",
+    "contrast_score",
+    "clarity_eval",
+    "noise_eval",
+    "quality_score",
+)
+
+# 按 MODULE_ORDER 冻结的权重向量，供批量加权求和；numpy 不可用时为 None
+FUSION_WEIGHTS_VEC = (
+    _np.array([FUSION_WEIGHTS[name] for name in MODULE_ORDER], dtype=_np.float64)
+    if _np is not None
+    else None
+)
+
 
 class Settings:
     """Runtime configuration."""
@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List
 
+# 应用卡片为只读常量，tags/modules 使用元组，共享时无需防御性拷贝
 APPLICATIONS: List[Dict[str, Any]] = [
     {
         "id": "text2image",
@@ -13,16 +14,16 @@ APPLICATIONS: List[Dict[str, Any]] = [
         "author": "Aesthetic Lab",
         "cover": "/covers/text2image.png",
         "desc": "输入文字，生成高质量图像。",
-        "tags": ["生成", "文生图", "AI绘画"],
+        "tags": ("生成", "文生图", "AI绘画"),
         "likes": 720,
         "views": 3400,
         "category": "image",
-        "modules": [
+        "modules": (
             "color_score",
             "contrast_score",
             "clarity_eval",
             "noise_eval",
-        ],
+        ),
     },
     {
         "id": "image-compose",
@@ -31,16 +32,16 @@ APPLICATIONS: List[Dict[str, Any]] = [
         "author": "Aesthetic Lab",
         "cover": "/covers/image-compose.png",
         "desc": "上传产品照片，一键生成电商宣传图。",
-        "tags": ["图生图", "营销", "智能生成"],
+        "tags": ("图生图", "营销", "智能生成"),
         "likes": 512,
         "views": 2210,
         "category": "image",
-        "modules": [
+        "modules": (
             "holistic",
             "color_score",
             "contrast_score",
             "clarity_eval",
-        ],
+        ),
     },
     # {
     #     "id": "image2video",
@@ -49,11 +50,11 @@ APPLICATIONS: List[Dict[str, Any]] = [
     #     "author": "Aesthetic Lab",
     #     "cover": "/covers/image2video.png",
     #     "desc": "从静态图像生成动效视频。",
-    #     "tags": ["视频生成", "动态图像"],
+    #     "tags": ("视频生成", "动态图像"),
     #     "likes": 412,
     #     "views": 2103,
     #     "category": "video",
-    #     "modules": ["clarity_eval", "quality_score"],
+    #     "modules": ("clarity_eval", "quality_score"),
     # },
     # {
     #     "id": "style-transfer",
@@ -62,14 +63,17 @@ APPLICATIONS: List[Dict[str, Any]] = [
     #     "author": "Aesthetic Lab",
     #     "cover": "/covers/style-transfer.png",
     #     "desc": "一键将作品转换为不同艺术流派风格。",
-    #     "tags": ["风格转换", "图像处理"],
+    #     "tags": ("风格转换", "图像处理"),
     #     "likes": 188,
     #     "views": 983,
     #     "category": "style",
-    #     "modules": ["color_score", "quality_score"],
+    #     "modules": ("color_score", "quality_score"),
     # },
 ]
 
+# 按 id 建立索引，供应用详情接口 O(1) 查找。
+APPLICATIONS_BY_ID: Dict[str, Dict[str, Any]] = {app["id"]: app for app in APPLICATIONS}
+
 APP_TEMPLATES: Dict[str, Dict[str, Any]] = {
     "text2image": {
         "id": "text2image",
@@ -1,13 +1,31 @@
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
+import os
+import queue
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from itertools import cycle, islice
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Tuple
+
+import orjson
 from fastapi import Depends, FastAPI, HTTPException, Path
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from gateway.orchestrator import ServiceOrchestrator
 from gateway.schemas import GenerateRequest, GenerateResponse
-from gateway.data import APPLICATIONS, APP_TEMPLATES, USER_PROFILES, WORKS, GALLERY_ITEMS
+from gateway.data import (
+    APPLICATIONS,
+    APPLICATIONS_BY_ID,
+    APP_TEMPLATES,
+    GALLERY_ITEMS,
+    USER_PROFILES,
+    WORKS,
+)
 from services.enhancer.service import EnhancementService
 from services.generate.service import GenerationService
 from services.generate.routes import providers as provider_routes
@@ -21,15 +39,47 @@ from services.pipeline import (
 )
 from services.proxy.proxy_base import router as proxy_router
 
+
+class _DeferredQueueHandler(QueueHandler):
+    """入队前只解析消息参数，异常堆栈的格式化与输出交给后台监听线程。"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# 请求路径上的日志只做入队，格式化与 stderr 写入在 QueueListener 线程完成
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+)
+_log_listener = QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    handlers=[_DeferredQueueHandler(_log_queue)],
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
+# 仅记录密钥是否存在，避免把密钥内容写进日志
+logger.debug("DASHSCOPE_API_KEY set: %s", bool(os.getenv("DASHSCOPE_API_KEY")))
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI):
+    yield
+    # 下游调用共用一个连接池，随应用关闭统一释放
+    await _ORCHESTRATOR.aclose()
+
 
 app = FastAPI(
     title="Aesthetics Engine",
     version="0.1.0",
+    lifespan=_lifespan,
 )
 
 app.add_middleware(
@@ -43,27 +93,39 @@ app.include_router(provider_routes.router)
 app.include_router(proxy_router)
 
 
+# 各子服务均为无请求态的封装，进程内构建一次即可复用，避免每个请求重建对象图。
+_ORCHESTRATOR = ServiceOrchestrator(
+    generation_service=GenerationService(),
+    scoring_aggregator=ScoringAggregator(),
+    enhancer=EnhancementService(),
+    selector=SelectorService(),
+)
+
+
+# 静态列表数据在导入时序列化一次，接口直接返回字节，免去每次请求的 JSON 编码。
+_APPLICATIONS_JSON = orjson.dumps(APPLICATIONS)
+_WORKS_JSON = orjson.dumps(WORKS)
+_APP_DETAIL_JSON = {
+    app_id: orjson.dumps({"meta": APPLICATIONS_BY_ID.get(app_id), "template": template})
+    for app_id, template in APP_TEMPLATES.items()
+}
+
+
 def get_orchestrator() -> ServiceOrchestrator:
-    """构建服务编排器，按需注入各子服务。"""
-    generation_service = GenerationService()
-    scoring_aggregator = ScoringAggregator()
-    enhancer = EnhancementService()
-    selector = SelectorService()
-    return ServiceOrchestrator(
-        generation_service=generation_service,
-        scoring_aggregator=scoring_aggregator,
-        enhancer=enhancer,
-        selector=selector,
-    )
+    """返回进程级共享的服务编排器。"""
+    return _ORCHESTRATOR
 
 
 @app.post("/v1/aesthetic", response_model=GenerateResponse)
 async def generate_endpoint(
     payload: GenerateRequest,
     orchestrator: ServiceOrchestrator = Depends(get_orchestrator),
-) -> GenerateResponse:
+) -> Response:
+    # response_model 仅用于 OpenAPI 文档；结果已是 GenerateResponse，直接序列化返回，
+    # 省去 FastAPI 对响应体的二次校验与导出。
     try:
-        return await orchestrator.handle_generate(payload)
+        result = await orchestrator.handle_generate(payload)
+        return Response(content=result.model_dump_json(), media_type="application/json")
     except Exception as exc:  # noqa: BLE001 - top-level guard for API stability
         logger.exception("Failed to handle generate request: %s", exc)
         raise HTTPException(status_code=500, detail="generation_failed") from exc
@@ -104,29 +166,24 @@ async def image2image_pipeline_endpoint(
 
 
 @app.get("/api/apps")
-async def list_apps() -> list[dict]:
+async def list_apps() -> Response:
     """返回所有可用的应用卡片信息。"""
-    return APPLICATIONS
+    return Response(content=_APPLICATIONS_JSON, media_type="application/json")
 
 
 @app.get("/api/apps/{app_id}")
-async def get_app_detail(app_id: str = Path(..., description="应用标识")) -> dict:
+async def get_app_detail(app_id: str = Path(..., description="应用标识")) -> Response:
     """获取指定应用的参数模板和元信息。"""
-    if app_id not in APP_TEMPLATES:
+    body = _APP_DETAIL_JSON.get(app_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="app_not_found")
-
-    metadata = next((item for item in APPLICATIONS if item["id"] == app_id), None)
-    payload = APP_TEMPLATES[app_id]
-    return {
-        "meta": metadata,
-        "template": payload,
-    }
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/works")
-async def list_works() -> list[dict]:
+async def list_works() -> Response:
     """获取作品市场的最新内容。"""
-    return WORKS
+    return Response(content=_WORKS_JSON, media_type="application/json")
 
 
 @app.get("/api/mock/gallery")
@@ -135,22 +192,9 @@ async def list_mock_gallery(page: int = 1, page_size: int = 9) -> dict:
     if page < 1:
         page = 1
     page_size = max(3, min(page_size, 18))
-    start = (page - 1) * page_size
-    end = start + page_size
     total = len(GALLERY_ITEMS)
-    if total == 0:
-        items = []
-        has_more = False
-    else:
-        # 循环复用静态数据以模拟无限滚动
-        items = [
-            {
-                **GALLERY_ITEMS[idx % total],
-                "id": f"{GALLERY_ITEMS[idx % total]['id']}-p{page}-i{idx}",
-            }
-            for idx in range(start, end)
-        ]
-        has_more = True
+    items = _gallery_page(page, page_size)
+    has_more = total > 0
     return {
         "page": page,
         "page_size": page_size,
@@ -160,6 +204,21 @@ async def list_mock_gallery(page: int = 1, page_size: int = 9) -> dict:
     }
 
 
+@lru_cache(maxsize=128)
+def _gallery_page(page: int, page_size: int) -> Tuple[Dict[str, Any], ...]:
+    """构建指定分页的图库条目；静态数据不变，热门分页直接命中缓存。"""
+    total = len(GALLERY_ITEMS)
+    if total == 0:
+        return ()
+    start = (page - 1) * page_size
+    # 循环复用静态数据以模拟无限滚动：从起始偏移处切出本页条目，免去逐项取模
+    base_items = islice(cycle(GALLERY_ITEMS), start % total, start % total + page_size)
+    return tuple(
+        {**item, "id": f"{item['id']}-p{page}-i{idx}"}
+        for idx, item in enumerate(base_items, start)
+    )
+
+
 @app.get("/api/user/{user_id}")
 async def get_user_profile(user_id: str) -> dict:
     """返回用户资料及额度信息。"""
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 from typing import Dict, Optional
-from uuid import uuid4
 
 from gateway.schemas import GenerateRequest, GenerateResponse
+from services.common.http import aclose_http_client
+from services.common.ids import uuid7
 from services.enhancer.service import EnhancementService
 from services.generate.service import GenerationService
 from services.scoring.aggregator import AggregationResult, ScoringAggregator
@@ -13,13 +14,6 @@ from services.selector.service import SelectorService
 logger = logging.getLogger(__name__)
 
 
-def _public_scores(module_scores: Dict[str, float]) -> Dict[str, float]:
-    """Expose only the holistic (MNet) score for front-end display."""
-    if "holistic" in module_scores and module_scores["holistic"] is not None:
-        return {"holistic": module_scores["holistic"]}
-    return {}
-
-
 class ServiceOrchestrator:
     """负责协调生成、评分、增强与选图的核心编排器。"""
 
@@ -35,30 +29,36 @@ class ServiceOrchestrator:
         self._enhancer = enhancer
         self._selector = selector
 
+    async def aclose(self) -> None:
+        """释放编排器生命周期内共享的下游 HTTP 连接池。"""
+        await aclose_http_client()
+
     async def handle_generate(self, payload: GenerateRequest) -> GenerateResponse:
         """执行完整流程：生成 → 增强 → 评分 → 选图 → 返回结果。"""
-        task_id = uuid4()
-        logger.info("Handling generate request", extra={"task_id": str(task_id)})
+        task_id = uuid7()
+        task_id_str = str(task_id)
+        logger.info("Handling generate request", extra={"task_id": task_id_str})
 
         generation_result = await self._generation_service.generate(
             task_id=task_id, request=payload
         )
         logger.debug(
             "Generation completed",
-            extra={"task_id": str(task_id), "image_count": len(generation_result.images)},
+            extra={"task_id": task_id_str, "image_count": len(generation_result.images)},
         )
 
         processed_images = generation_result.images
         if payload.enhancement.apply_clarity:
-            processed_images = await self._enhancer.apply_clarity(
-                task_id=task_id, images=processed_images
+            processed_images = self._enhancer.apply_clarity(
+                task_id=task_id_str, images=processed_images
             )
 
+        # 清晰术只改写 metadata，评分按 url 读取图片本身，直接对生成结果评分即可
         scoring_summary: Optional[AggregationResult] = None
-        if processed_images and payload.use_modules:
+        if generation_result.images and payload.use_modules:
             scoring_summary = await self._scoring_aggregator.score_candidates(
                 task_id=task_id,
-                images=processed_images,
+                images=generation_result.images,
                 modules=payload.use_modules,
             )
 
@@ -69,13 +69,18 @@ class ServiceOrchestrator:
         )
 
         modules_used = scoring_summary.modules_used if scoring_summary else []
-        final_scores = {}
+        final_scores: Dict[str, float] = {}
         composite_score: Optional[float] = None
-        if selection.evaluation:
-            final_scores = _public_scores(selection.evaluation.module_scores)
-            composite_score = selection.evaluation.composite_score
+        evaluation = selection.evaluation
+        if evaluation:
+            # 前端只展示 holistic（MNet）分数
+            holistic = evaluation.module_scores.get("holistic")
+            if holistic is not None:
+                final_scores = {"holistic": holistic}
+            composite_score = evaluation.composite_score
 
-        return GenerateResponse(
+        # 字段均由编排流程产出，属可信数据，跳过 Pydantic 校验直接构造
+        return GenerateResponse.model_construct(
             status="success",
             task_id=task_id,
             image_url=selection.image.url,
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
@@ -13,7 +13,7 @@ class EnhancementOptions(BaseModel):
 class GenerateRequest(BaseModel):
     """统一入口请求体，描述一次生成与美学评估任务。"""
 
-    task: str = Field(pattern="^(text2image|image2image)$", description="任务类型")
+    task: Literal["text2image", "image2image"] = Field(description="任务类型")
     prompt: str = Field(description="生成提示词")
     provider: str = Field(description="外部生成服务提供商")
     size: str = Field(default="512x512", description="生成图像尺寸")
@@ -39,3 +39,19 @@ class GenerateResponse(BaseModel):
         default=None, description="最佳候选图像地址"
     )
     detail: Optional[str] = Field(default=None, description="失败时的详细描述")
+
+
+def _warm_up_models() -> None:
+    """导入时各跑一次请求校验与响应序列化。
+
+    Pydantic v2 在类定义时已编译核心 schema（未启用 ``defer_build``），
+    ``model_rebuild()`` 此处为空操作；首个请求剩余的冷启动开销来自校验器/序列化器
+    的首次执行，在导入阶段预先触发即可。
+    """
+    request = GenerateRequest.model_validate(
+        {"task": "text2image", "prompt": "warm-up", "provider": "warm-up"}
+    )
+    GenerateResponse(status="success", image_url="", modules_used=request.use_modules).model_dump_json()
+
+
+_warm_up_models()
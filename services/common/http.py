@@ -0,0 +1,81 @@
+"""进程级共享的 httpx 异步客户端。
+
+按调用新建 ``AsyncClient`` 会让每个请求都重新完成 TCP/TLS 握手；这里维护一个
+长生命周期的连接池供各下游调用复用，由网关在关闭时统一释放。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config.default import settings
+
+# HTTP/2 依赖 h2 包（随 ``httpx[http2]`` 安装），缺失时回退为 HTTP/1.1 keep-alive；
+# 多个并发生成请求可在同一条连接上多路复用，大体积参考图不会相互阻塞
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Accept-Encoding 沿用 httpx 默认值：安装 brotli（随 ``httpx[brotli]``）后自动协商 br，
+# 否则为 gzip/deflate；这里只补充可识别的 User-Agent
+DEFAULT_HEADERS = {"User-Agent": "BeautyMaker/1.0"}
+
+# 空闲连接保留 60 秒，覆盖轮询间隔与相邻请求之间的空档
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=256,
+    max_keepalive_connections=64,
+    keepalive_expiry=60.0,
+)
+
+# 连接池绑定创建它的事件循环；按代理地址区分客户端（None 表示直连）
+_clients: Dict[Optional[str], httpx.AsyncClient] = {}
+_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def build_async_client(**kwargs: Any) -> httpx.AsyncClient:
+    """按统一的超时、连接池与协议配置构建客户端，调用方可覆盖任意参数。"""
+    kwargs.setdefault("timeout", settings.provider_timeouts)
+    kwargs.setdefault("limits", DEFAULT_LIMITS)
+    kwargs.setdefault("http2", HTTP2_AVAILABLE)
+    kwargs.setdefault("headers", DEFAULT_HEADERS)
+    return httpx.AsyncClient(**kwargs)
+
+
+def get_http_client(*, proxy: Optional[str] = None) -> httpx.AsyncClient:
+    """返回当前事件循环上的共享客户端，需要走代理的调用按代理地址各用一个。
+
+    事件循环变化（如测试中多次 ``asyncio.run``）时全部重建。超时按请求传入即可，
+    无需为不同超时单独建池。
+    """
+    global _clients_loop
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        _clients.clear()
+        _clients_loop = loop
+    client = _clients.get(proxy)
+    if client is None or client.is_closed:
+        client = _clients[proxy] = build_async_client(proxy=proxy)
+    return client
+
+
+async def aclose_http_client() -> None:
+    """关闭全部共享客户端并释放连接池。"""
+    global _clients_loop
+    clients = list(_clients.values())
+    _clients.clear()
+    _clients_loop = None
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
+
+
+__all__ = [
+    "DEFAULT_HEADERS",
+    "DEFAULT_LIMITS",
+    "HTTP2_AVAILABLE",
+    "aclose_http_client",
+    "build_async_client",
+    "get_http_client",
+]
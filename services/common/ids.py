@@ -0,0 +1,29 @@
+"""任务标识生成工具。
+
+任务 ID 采用按时间有序的 UUIDv7（RFC 9562）：线上与 UUID4 同为 128 位、
+可直接作为 ``UUID`` 字段传输；作为存储主键时按时间递增，避免 B-tree 随机插入。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from uuid import UUID
+
+try:  # Python 3.14+ 标准库自带实现
+    from uuid import uuid7
+except ImportError:
+
+    def uuid7() -> UUID:
+        """生成 UUIDv7：48 位毫秒时间戳 + 版本/变体位 + 74 位随机数。"""
+        timestamp_ms = time.time_ns() // 1_000_000
+        rand = int.from_bytes(os.urandom(10), "big")
+        value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        value |= 0x7 << 76  # version 7
+        value |= ((rand >> 68) & 0xFFF) << 64  # rand_a
+        value |= 0b10 << 62  # RFC 9562 variant
+        value |= rand & 0x3FFF_FFFF_FFFF_FFFF  # rand_b
+        return UUID(int=value)
+
+
+__all__ = ["uuid7"]
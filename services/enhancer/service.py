@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from dataclasses import replace
 from typing import Iterable, List
 from uuid import UUID
 
@@ -10,22 +9,28 @@ from services.common.models import GeneratedImage
 class EnhancementService:
     """执行图片增强流程，例如清晰术，以提升最终观感。"""
 
-    async def apply_clarity(
+    def apply_clarity(
         self,
         *,
-        task_id: UUID,
+        task_id: UUID | str,
         images: Iterable[GeneratedImage],
     ) -> List[GeneratedImage]:
-        enhanced: List[GeneratedImage] = []
-        for image in images:
-            metadata = dict(image.metadata)
-            # 标记清晰术已生效，方便后续排查
-            metadata["clarity_enhanced"] = True
-            metadata["enhancement_task"] = str(task_id)
-            enhanced.append(
-                replace(
-                    image,
-                    metadata=metadata,
-                )
+        """为图片打上清晰术标记；纯内存操作，同步执行即可。
+
+        ``task_id`` 可直接传入已格式化的字符串，避免重复格式化 UUID。
+        """
+        # 标记清晰术已生效，方便后续排查；同一批图片共享同一份标记
+        overlay = {"clarity_enhanced": True, "enhancement_task": str(task_id)}
+        # 生成阶段的图片可能共享同一个 metadata 字典，因此用 ``|`` 合并出新字典而非原地修改；
+        # 下游按 dict 使用 metadata，故不采用 ChainMap 视图。
+        # 直接调用构造函数而非 dataclasses.replace，省去逐字段反射；
+        # 字段列表需与 services.common.models.GeneratedImage 保持一致。
+        return [
+            GeneratedImage(
+                url=image.url,
+                provider=image.provider,
+                prompt=image.prompt,
+                metadata=image.metadata | overlay,
             )
-        return enhanced
+            for image in images
+        ]
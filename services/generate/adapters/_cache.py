@@ -0,0 +1,93 @@
+"""生成结果的进程内短时去重缓存。
+
+相同 (提供商, 提示词, 尺寸, 参数) 的请求在数秒的 TTL 内直接复用上一次的结果，
+只覆盖重试与重复提交；并发的相同请求合并为一次远程调用，其余调用方等待同一结果。
+TTL 过后同样的请求会重新生成，用户“再来一次”不会拿到旧图。
+每个调用方拿到的都是结果的深拷贝，修改不会影响缓存或其他请求。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import orjson
+
+DEFAULT_TTL = 5.0
+MAX_ENTRIES = 256
+
+Producer = Callable[[], Awaitable[Dict[str, Any]]]
+ShouldCache = Callable[[Dict[str, Any]], bool]
+
+_entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+def make_key(parts: Sequence[Any]) -> Optional[str]:
+    """对请求要素做稳定哈希；包含无法序列化的参数时返回 None（不缓存）。"""
+    try:
+        encoded = orjson.dumps(list(parts), option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+async def cached(
+    key: str,
+    ttl: float,
+    producer: Producer,
+    *,
+    should_cache: Optional[ShouldCache] = None,
+) -> Dict[str, Any]:
+    """命中且未过期时直接返回缓存结果，否则调用 ``producer`` 并按需写入缓存。"""
+    entry = _entries.get(key)
+    if entry is not None:
+        expires_at, value = entry
+        if expires_at > time.monotonic():
+            _entries.move_to_end(key)
+            return _copy_response(value)
+        del _entries[key]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(producer())
+        _inflight[key] = task
+        task.add_done_callback(partial(_on_done, key, ttl, should_cache))
+    # shield：单个调用方被取消时不影响其他等待同一结果的请求
+    return _copy_response(await asyncio.shield(task))
+
+
+def _copy_response(value: Dict[str, Any]) -> Dict[str, Any]:
+    """深拷贝响应（含 images、metadata 及其中嵌套的 usage 等），调用方可放心修改。"""
+    return copy.deepcopy(value)
+
+
+def _on_done(
+    key: str,
+    ttl: float,
+    should_cache: Optional[ShouldCache],
+    task: "asyncio.Task[Dict[str, Any]]",
+) -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    value = task.result()
+    if should_cache is not None and not should_cache(value):
+        return
+    _entries[key] = (time.monotonic() + ttl, value)
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+def clear() -> None:
+    """清空缓存（不影响进行中的请求）。"""
+    _entries.clear()
+
+
+__all__ = ["DEFAULT_TTL", "MAX_ENTRIES", "cached", "clear", "make_key"]
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
 
 from services.generate.models import GenerateRequestPayload
 
+# 单个提供商调用的最长等待时间，避免个别慢接口拖住整批结果
+GENERATE_MANY_TIMEOUT = 90.0
+# 提示词长度上限：远超各家接口限制的输入直接拒绝，不再发起远程请求
+MAX_PROMPT_CHARS = 4000
+# 表示生成数量的参数名
+_COUNT_PARAMS = ("num_outputs", "num_variations", "max_images")
+
 
 class BaseProvider(ABC):
     """模型适配器基类，所有生成服务需继承此类。"""
@@ -14,3 +22,41 @@ class BaseProvider(ABC):
     @abstractmethod
     async def generate(self, request: GenerateRequestPayload) -> Dict[str, Any]:
         """执行生成任务并返回标准化结构。"""
+
+
+def validate_request(request: GenerateRequestPayload) -> None:
+    """在构建负载与发起网络请求前校验明显无效的输入，不合法时抛出 ``ValueError``。"""
+    if request.prompt and len(request.prompt) > MAX_PROMPT_CHARS:
+        raise ValueError(
+            f"Prompt exceeds {MAX_PROMPT_CHARS} characters ({len(request.prompt)})."
+        )
+    params = request.params
+    if params is not None and not isinstance(params, dict):
+        raise ValueError("Generation params must be a mapping.")
+    for key in _COUNT_PARAMS:
+        value = (params or {}).get(key)
+        if value is None:
+            continue
+        try:
+            count = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameter '{key}' must be a positive integer.") from None
+        if count < 1:
+            raise ValueError(f"Parameter '{key}' must be a positive integer.")
+
+
+async def generate_many(
+    providers: Sequence[BaseProvider],
+    request: GenerateRequestPayload,
+    *,
+    timeout: float = GENERATE_MANY_TIMEOUT,
+) -> List[Dict[str, Any] | BaseException]:
+    """并发调用多个提供商，返回与 ``providers`` 顺序一致的结果列表。
+
+    各提供商请求相互独立，并发后总耗时取决于最慢的一个而非全部之和；
+    单个提供商失败或超时时，对应位置为异常对象，不影响其余结果。
+    """
+    return await asyncio.gather(
+        *(asyncio.wait_for(provider.generate(request), timeout) for provider in providers),
+        return_exceptions=True,
+    )
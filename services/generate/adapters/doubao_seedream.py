@@ -8,11 +8,15 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from uuid import uuid4
 import httpx
+import orjson
 
-from services.generate.adapters.base import BaseProvider
+from services.common.http import get_http_client
+from services.generate.adapters.base import BaseProvider, validate_request
 from services.generate.models import GenerateRequestPayload
 
 
@@ -26,6 +30,11 @@ _PLACEHOLDER_IMAGE = (
     "iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAAJElEQVR4Xu3BAQ0AAADCoPdPbQ43oAAAAAAAAAAA"
     "AAAAAAAAAPgPqdcAAT3mKMUAAAAASUVORK5CYII="
 )
+# 占位响应的不变部分，按需浅拷贝后补充 task_id / images / metadata
+_PLACEHOLDER_TEMPLATE: Dict[str, Any] = {
+    "status": "success",
+    "image_url": _PLACEHOLDER_IMAGE,  # 1x1 透明 PNG
+}
 
 # 默认使用的模型名称
 DEFAULT_MODEL = "doubao-seedream-4-0-250828"
@@ -33,8 +42,71 @@ DEFAULT_MODEL = "doubao-seedream-4-0-250828"
 DEFAULT_SIZE = "2K"
 # 火山引擎 Ark 平台的图像生成 API 端点
 ARK_ENDPOINT = "https://ark.cn-beijing.volces.com/api/v3/images/generations"
+# 组图生成单次请求允许的最大图片数
+MAX_SEQUENTIAL_IMAGES = 15
+# 生成耗时长但建连应当很快，连接阶段单独收紧以便尽早失败
+ARK_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# API 密钥候选环境变量（按优先级排列）
+API_KEY_ENV_VARS = ("ARK_API_KEY", "DOUBAO_API_KEY", "HOLISTIC_SCORE_TOKEN")
 
 
+@lru_cache(maxsize=1)
+def _resolve_api_key() -> Tuple[Optional[str], Optional[str]]:
+    """返回 ``(来源变量名, 密钥)``，首次调用后缓存。
+
+    环境变量在进程内基本不变，无需每个请求重新读取；轮换密钥后调用
+    ``_resolve_api_key.cache_clear()`` 即可重新加载。
+    """
+    for name in API_KEY_ENV_VARS:
+        value = os.getenv(name)
+        if value:
+            return name, value
+    return None, None
+
+
+@lru_cache(maxsize=4)
+def _build_headers(api_key: str) -> Mapping[str, str]:
+    """构建（并缓存）只读请求头；httpx 会在发送时自行复制。"""
+    return MappingProxyType(
+        {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        }
+    )
+
+
+@lru_cache(maxsize=64)
+def _normalize_size(size: Optional[str]) -> str:
+    """归一化图像尺寸字符串
+
+    将各种尺寸表示法统一为标准格式。
+    例如：将 "1024×1024" 和 "1024X1024" 都转换为 "1024x1024"
+    常见取值只有少数几种，结果缓存后直接查表。
+
+    Args:
+        size: 原始尺寸字符串
+
+    Returns:
+        归一化后的尺寸字符串
+    """
+    if not size:
+        return DEFAULT_SIZE
+    normalized = str(size).strip()
+    # 将全角乘号和大写 X 替换为小写 x
+    normalized = normalized.replace("×", "x").replace("X", "x")
+    return normalized
+
+
+def _wrap_reference(ref: str) -> str:
+    """将参考图转换为 API 接受的形式
+
+    HTTP(S) URL 与 data URI 直接保留；原始 base64 字符串补上 data URI 头部
+    （为安全起见假设为 PNG 格式）。
+    """
+    if ref.startswith(("http://", "https://", "data:")):
+        return ref
+    return f"data:image/png;base64,{ref}"
+
 
 class DoubaoSeedreamProvider(BaseProvider):
     """豆包 Seedream 图像生成提供商
@@ -56,26 +128,17 @@ class DoubaoSeedreamProvider(BaseProvider):
         Returns:
             包含生成图片 URL 列表和元数据的字典
         """
-        # 尝试从多个环境变量中获取 API 密钥（优先级顺序）
-        env_tokens = {
-            "ARK_API_KEY": os.getenv("ARK_API_KEY"),
-            "DOUBAO_API_KEY": os.getenv("DOUBAO_API_KEY"),
-            "HOLISTIC_SCORE_TOKEN": os.getenv("HOLISTIC_SCORE_TOKEN"),
-        }
-        # 获取第一个非空的 API 密钥
-        api_key = next((value for value in env_tokens.values() if value), None)
-        # 记录密钥来源
-        token_source = next((name for name, value in env_tokens.items() if value), None)
-        token_length = len(api_key) if api_key else 0
-        # 记录初始化信息（用于调试）
-        logger.info(
-            "Doubao Seedream init prompt=%s token_source=%s token_present=%s token_length=%s env_snapshot=%s",
-            request.prompt[:30] + "..." if request.prompt and len(request.prompt) > 30 else request.prompt,
-            token_source,
-            bool(api_key),
-            token_length,
-            {k: bool(v) for k, v in env_tokens.items()},
-        )
+        validate_request(request)
+        token_source, api_key = _resolve_api_key()
+        # 记录初始化信息（用于调试）；参数需要先截断/计算，未开启 DEBUG 时整体跳过
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Doubao Seedream init prompt=%s token_source=%s token_present=%s token_length=%s",
+                request.prompt[:30] + "..." if request.prompt and len(request.prompt) > 30 else request.prompt,
+                token_source,
+                bool(api_key),
+                len(api_key) if api_key else 0,
+            )
         # 使用请求中的 prompt，如果为空则使用默认值
         prompt = request.prompt or "Aesthetics Engine prompt"
 
@@ -87,21 +150,19 @@ class DoubaoSeedreamProvider(BaseProvider):
         # 构建 API 请求负载
         payload = self._build_payload(request=request, prompt=prompt)
 
-        # 构建请求头
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        }
+        # 请求头随密钥缓存，每次请求直接复用
+        headers = _build_headers(api_key)
 
         try:
-            # 发送 HTTP POST 请求到豆包 API（超时 60 秒）
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(ARK_ENDPOINT, json=payload, headers=headers)
+            # 发送 HTTP POST 请求到豆包 API（超时 60 秒）；复用共享连接池，免去每次 TLS 握手
+            response = await get_http_client().post(
+                ARK_ENDPOINT, json=payload, headers=headers, timeout=ARK_TIMEOUT
+            )
             # 检查响应状态码
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             # 从响应中提取图片 URL
-            images = self._extract_urls(data)
+            images, image_size = self._extract_urls_and_size(data)
             if not images:
                 raise RuntimeError(f"Doubao response missing images: {data}")
 
@@ -110,14 +171,14 @@ class DoubaoSeedreamProvider(BaseProvider):
                 "provider": self.name,
                 "prompt": prompt,
                 "model": data.get("model", payload.get("model")),
-                "size": self._extract_size(data) or payload.get("size"),
+                "size": image_size or payload.get("size"),
                 "usage": data.get("usage"),  # API 使用情况（token 计数等）
             }
 
             # 返回成功响应
             return {
                 "status": "success",
-                "task_id": str(request.task_id or uuid4()),
+                "task_id": request.task_id_str,
                 "images": images,  # 图片 URL 列表
                 "image_url": images[0],  # 第一张图片（向后兼容）
                 "metadata": metadata,
@@ -166,7 +227,7 @@ class DoubaoSeedreamProvider(BaseProvider):
         # 处理图像尺寸
         raw_size = params.get("size") or request.size or DEFAULT_SIZE
         # Seedream 4.0 支持 "1K", "2K" 或 "WxH" 格式，进行归一化
-        size = self._normalize_size(raw_size)
+        size = _normalize_size(raw_size)
 
         # 构建基础请求负载
         payload: Dict[str, Any] = {
@@ -179,82 +240,49 @@ class DoubaoSeedreamProvider(BaseProvider):
             "sequential_image_generation": "disabled",
         }
 
+        # 仅在调用方显式传入 max_images 时开启组图生成：max_images 只是上限，实际张数
+        # 由模型按提示词决定，且返回的是一组关联图片，不能替代多次独立生成
+        num_images = int(params.get("max_images") or 1)
+        if num_images > 1:
+            payload["sequential_image_generation"] = "auto"
+            payload["sequential_image_generation_options"] = {
+                "max_images": max(1, min(num_images, MAX_SEQUENTIAL_IMAGES)),
+            }
+
         # 处理参考图片（如果有）
         if references:
-            processed_refs = []
-            for ref in references:
-                if not isinstance(ref, str):
-                    continue
-
-                if ref.startswith("http://") or ref.startswith("https://"):
-                    # HTTP(S) URL 格式可以直接使用
-                    processed_refs.append(ref)
-                elif ref.startswith("data:"):
-                    # Data URI 格式（API 要求的格式），直接保留
-                    processed_refs.append(ref)
-                else:
-                    # 原始 base64 字符串，需要添加 data URI 头部
-                    # 为安全起见假设为 PNG 格式
-                    processed_refs.append(f"data:image/png;base64,{ref}")
+            processed_refs = [
+                _wrap_reference(ref) for ref in references if isinstance(ref, str)
+            ]
 
             # 重要：API 文档要求字段名为 'image'（不是 'image_urls'）
             payload["image"] = processed_refs
 
         return payload
 
-    def _extract_urls(self, payload: Dict[str, Any]) -> List[str]:
-        """从 Ark API 响应中提取图片 URL
+    def _extract_urls_and_size(self, payload: Dict[str, Any]) -> Tuple[List[str], Optional[str]]:
+        """从 Ark API 响应中一次遍历提取图片 URL 与图像尺寸
 
         Args:
             payload: Ark API 返回的响应数据
 
         Returns:
-            图片 URL 列表
+            (图片 URL 列表, 第一个尺寸字符串如 "1024x1024"；未找到时为 None)
         """
         urls: List[str] = []
+        size: Optional[str] = None
         data = payload.get("data")
         # 响应中的 data 字段是一个列表，每个元素包含一张图片的信息
         if isinstance(data, list):
             for item in data:
-                if isinstance(item, dict) and item.get("url"):
-                    urls.append(item["url"])
-        return urls
-
-    def _extract_size(self, payload: Dict[str, Any]) -> Optional[str]:
-        """从 Ark API 响应中提取图像尺寸
-
-        Args:
-            payload: Ark API 返回的响应数据
-
-        Returns:
-            图像尺寸字符串（如 "1024x1024"），如果未找到则返回 None
-        """
-        data = payload.get("data")
-        if isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict) and item.get("size"):
-                    return item["size"]
-        return None
-
-    @staticmethod
-    def _normalize_size(size: Optional[str]) -> str:
-        """归一化图像尺寸字符串
-
-        将各种尺寸表示法统一为标准格式。
-        例如：将 "1024×1024" 和 "1024X1024" 都转换为 "1024x1024"
-
-        Args:
-            size: 原始尺寸字符串
-
-        Returns:
-            归一化后的尺寸字符串
-        """
-        if not size:
-            return DEFAULT_SIZE
-        normalized = str(size).strip()
-        # 将全角乘号和大写 X 替换为小写 x
-        normalized = normalized.replace("×", "x").replace("X", "x")
-        return normalized
+                if not isinstance(item, dict):
+                    continue
+                url = item.get("url")
+                if url:
+                    urls.append(url)
+                if size is None and item.get("size"):
+                    size = item["size"]
+        return urls, size
 
     def _placeholder(self, *, prompt: str, reason: Optional[str]) -> Dict[str, Any]:
         """返回占位符图片响应
@@ -275,10 +303,9 @@ class DoubaoSeedreamProvider(BaseProvider):
             "prompt": prompt,
             "note": f"Doubao placeholder response ({reason or 'unknown'})",
         }
-        return {
-            "status": "success",
-            "task_id": str(uuid4()),
-            "images": [_PLACEHOLDER_IMAGE],  # 1x1 透明 PNG
-            "image_url": _PLACEHOLDER_IMAGE,
-            "metadata": metadata,
-        }
+        response = _PLACEHOLDER_TEMPLATE.copy()
+        response["task_id"] = str(uuid4())
+        # images 列表可能被下游修改，每次单独创建
+        response["images"] = [_PLACEHOLDER_IMAGE]
+        response["metadata"] = metadata
+        return response
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, Iterable, List, Optional
-from uuid import uuid4
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
 
 import httpx
+import orjson
 
-from services.generate.adapters.base import BaseProvider
+from services.common.http import get_http_client
+from services.generate.adapters.base import BaseProvider, validate_request
 from services.generate.models import GenerateRequestPayload
 
 logger = logging.getLogger(__name__)
@@ -22,32 +25,34 @@ class OpenRouterImageProvider(BaseProvider):
     default_modalities: Optional[List[str]] = None
 
     async def generate(self, request: GenerateRequestPayload) -> Dict[str, Any]:
+        validate_request(request)
         payload = self._build_payload(request)
         headers = self._build_headers()
-        transport = _build_transport()
-
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with httpx.AsyncClient(timeout=timeout, transport=transport) as client:
-            try:
-                response = await client.post(
-                    self.endpoint,
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                detail = exc.response.text if exc.response is not None else str(exc)
-                logger.error(
-                    "OpenRouter request failed status=%s detail=%s provider=%s",
-                    exc.response.status_code if exc.response is not None else "n/a",
-                    detail,
-                    self.name,
-                )
-                raise RuntimeError(f"OpenRouter request failed: {detail}") from exc
-            except httpx.HTTPError as exc:
-                raise RuntimeError(f"OpenRouter network error: {exc}") from exc
-
-        body = response.json()
+
+        # Reuse the pooled client for this proxy so DALL·E / Nano Banana calls keep
+        # their connections (and the proxy tunnel) alive across requests.
+        client = get_http_client(proxy=_resolve_proxy())
+        try:
+            response = await client.post(
+                self.endpoint,
+                json=payload,
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout_seconds),
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            detail = exc.response.text if exc.response is not None else str(exc)
+            logger.error(
+                "OpenRouter request failed status=%s detail=%s provider=%s",
+                exc.response.status_code if exc.response is not None else "n/a",
+                detail,
+                self.name,
+            )
+            raise RuntimeError(f"OpenRouter request failed: {detail}") from exc
+        except httpx.HTTPError as exc:
+            raise RuntimeError(f"OpenRouter network error: {exc}") from exc
+
+        body = orjson.loads(response.content)
         images = self._extract_images(body)
         if not images:
             raise RuntimeError(f"OpenRouter response missing images: {body}")
@@ -63,7 +68,7 @@ class OpenRouterImageProvider(BaseProvider):
 
         return {
             "status": "success",
-            "task_id": str(request.task_id or uuid4()),
+            "task_id": request.task_id_str,
             "images": images,
             "image_url": images[0],
             "metadata": metadata,
@@ -136,53 +141,65 @@ class OpenRouterImageProvider(BaseProvider):
 
         return {"role": "user", "content": content}
 
-    def _build_headers(self) -> Dict[str, str]:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENROUTER_API_KEY is required for this provider.")
-
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        referer = os.getenv("OPENROUTER_SITE_URL")
-        if referer:
-            headers["HTTP-Referer"] = referer
-        title = os.getenv("OPENROUTER_SITE_NAME")
-        if title:
-            headers["X-Title"] = title
-        return headers
+    def _build_headers(self) -> Mapping[str, str]:
+        return _cached_headers()
 
     def _extract_images(self, body: Dict[str, Any]) -> List[str]:
+        # URLs are deduplicated (order-preserving) as they are found.
         images: List[str] = []
+        seen: Set[str] = set()
         choices = body.get("choices") or []
         for choice in choices:
             message = choice.get("message") or {}
-            images.extend(_extract_images_from_message(message))
+            _extract_images_from_message(message, seen, images)
 
         # Some providers may return images directly on the root object.
         if not images:
-            images.extend(_extract_images_from_message(body))
-
-        # Deduplicate while preserving order.
-        seen = set()
-        unique = []
-        for image in images:
-            if image and image not in seen:
-                seen.add(image)
-                unique.append(image)
-        return unique
+            _extract_images_from_message(body, seen, images)
+        return images
+
+
+@lru_cache(maxsize=1)
+def _cached_headers() -> Mapping[str, str]:
+    """Build the request headers from the environment once.
+
+    A missing key raises and is therefore not cached; call ``cache_clear()``
+    after rotating the key or site settings.
+    """
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENROUTER_API_KEY is required for this provider.")
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    referer = os.getenv("OPENROUTER_SITE_URL")
+    if referer:
+        headers["HTTP-Referer"] = referer
+    title = os.getenv("OPENROUTER_SITE_NAME")
+    if title:
+        headers["X-Title"] = title
+    return MappingProxyType(headers)
+
+
+def _extract_images_from_message(
+    message: Dict[str, Any],
+    seen: Set[str],
+    out: List[str],
+) -> None:
+    """Append unseen image URLs from ``message`` to ``out``, recording them in ``seen``."""
+
+    def add(url: Optional[str]) -> None:
+        if url and url not in seen:
+            seen.add(url)
+            out.append(url)
 
-
-def _extract_images_from_message(message: Dict[str, Any]) -> List[str]:
-    found: List[str] = []
     images_section = message.get("images") or []
     content_section = message.get("content")
 
     for entry in images_section:
-        url = _extract_url(entry)
-        if url:
-            found.append(url)
+        add(_extract_url(entry))
 
     if isinstance(content_section, list):
         for item in content_section:
@@ -191,45 +208,64 @@ def _extract_images_from_message(message: Dict[str, Any]) -> List[str]:
             if item.get("type") in {"output_image", "input_image", "image_url"}:
                 urls = item.get("images") or [item.get("image_url")]
                 for url_entry in urls:
-                    url = _extract_url(url_entry)
-                    if url:
-                        found.append(url)
+                    add(_extract_url(url_entry))
             elif item.get("type") == "text":
                 text = item.get("text")
-                if isinstance(text, str) and text.startswith("data:image"):
-                    found.append(text)
-    elif isinstance(content_section, str) and content_section.startswith("data:image"):
-        found.append(content_section)
-
-    return found
+                if isinstance(text, str) and _is_image_data_url(text):
+                    add(text)
+    elif isinstance(content_section, str) and _is_image_data_url(content_section):
+        add(content_section)
 
 
 def _extract_url(entry: Any) -> Optional[str]:
-    if isinstance(entry, str):
+    # Decoded JSON only yields exact builtin types, so ``type(x) is`` checks are safe
+    # and skip isinstance's subclass handling; the common shapes are tested first.
+    entry_type = type(entry)
+    if entry_type is str:
         return entry
-
-    if not isinstance(entry, dict):
+    if entry_type is not dict:
         return None
 
-    if "url" in entry and isinstance(entry["url"], str):
-        return entry["url"]
+    url = entry.get("url")
+    if type(url) is str:
+        return url
 
     image_url = entry.get("image_url")
-    if isinstance(image_url, dict):
+    image_url_type = type(image_url)
+    if image_url_type is dict:
         url = image_url.get("url")
-        if isinstance(url, str):
+        if type(url) is str:
             return url
-    elif isinstance(image_url, str):
+    elif image_url_type is str:
         return image_url
 
     data_field = entry.get("b64_json")
-    if isinstance(data_field, str):
+    if type(data_field) is str:
         return f"data:image/png;base64,{data_field}"
     return None
 
 
+# Reference kinds returned by _classify_reference.
+_REF_URL, _REF_DATA_URL, _REF_RAW_B64 = range(3)
+
+
+def _classify_reference(raw: str) -> int:
+    # Gate on the first character so raw base64 (the bulk of large payloads)
+    # usually skips the prefix comparisons entirely.
+    first = raw[:1]
+    if first == "h" and (raw.startswith("https://") or raw.startswith("http://")):
+        return _REF_URL
+    if first == "d" and raw.startswith("data:"):
+        return _REF_DATA_URL
+    return _REF_RAW_B64
+
+
+def _is_image_data_url(text: str) -> bool:
+    return text[:1] == "d" and text.startswith("data:image")
+
+
 def _normalize_image_reference(raw: str) -> str:
-    if raw.startswith(("http://", "https://", "data:")):
+    if _classify_reference(raw) != _REF_RAW_B64:
         return raw
     return f"data:image/png;base64,{raw}"
 
@@ -242,10 +278,3 @@ def _resolve_proxy() -> Optional[str]:
     if not proxy or proxy.lower() in {"none", "false", "no"}:
         return None
     return proxy
-
-
-def _build_transport() -> Optional[httpx.AsyncHTTPTransport]:
-    proxy = _resolve_proxy()
-    if not proxy:
-        return None
-    return httpx.AsyncHTTPTransport(proxy=proxy)
@@ -7,18 +7,53 @@ Ideal for posters, cartoons, and text-heavy images.
 
 from __future__ import annotations
 
+import bisect
 import logging
 import os
-import uuid
-from typing import Any, Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 import httpx
+import orjson
 
-from services.generate.adapters.base import BaseProvider
+from services.common.http import get_http_client
+from services.generate.adapters.base import BaseProvider, validate_request
 from services.generate.models import GenerateRequestPayload
 
 logger = logging.getLogger(__name__)
 
+# Qwen-Image only accepts these output sizes.
+_ALLOWED_SIZES = frozenset({"1664*928", "1472*1140", "1328*1328", "1140*1472", "928*1664"})
+_RATIO_SIZES = {
+    "16:9": "1664*928",
+    "4:3": "1472*1140",
+    "1:1": "1328*1328",
+    "3:4": "1140*1472",
+    "9:16": "928*1664",
+}
+# width / height lower bounds; a ratio maps to the size after the last bound it reaches.
+_RATIO_THRESHOLDS = (0.6, 0.9, 1.2, 1.5)
+_THRESHOLD_SIZES = ("928*1664", "1140*1472", "1328*1328", "1472*1140", "1664*928")
+_DEFAULT_SIZE = "1328*1328"
+
+
+@lru_cache(maxsize=1)
+def _resolve_api_key() -> Optional[str]:
+    """Read the DashScope key once; call ``cache_clear()`` after rotating it."""
+    return os.getenv("DASHSCOPE_API_KEY") or os.getenv("QWEN_API_KEY")
+
+
+@lru_cache(maxsize=4)
+def _build_headers(api_key: str) -> Mapping[str, str]:
+    """Read-only request headers for a key; httpx copies them per request."""
+    return MappingProxyType(
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+    )
+
 
 class QwenProvider(BaseProvider):
     """Tongyi Qianwen (Qwen-Image) synchronous generation adapter."""
@@ -32,13 +67,16 @@ class QwenProvider(BaseProvider):
         "/multimodal-generation/generation"
     )
     timeout_seconds = 120.0
+    # Built once; override together with ``timeout_seconds`` in subclasses.
+    timeout = httpx.Timeout(timeout_seconds)
 
     async def generate(self, request: GenerateRequestPayload) -> Dict[str, Any]:
         """Generate images using Qwen-Image synchronous API.
 
         Note: Qwen-Image is text-only (no reference images support).
         """
-        api_key = os.getenv("DASHSCOPE_API_KEY") or os.getenv("QWEN_API_KEY")
+        validate_request(request)
+        api_key = _resolve_api_key()
         if not api_key:
             raise RuntimeError(
                 "Missing DASHSCOPE_API_KEY for Qwen-Image integration."
@@ -86,10 +124,7 @@ class QwenProvider(BaseProvider):
         if seed is not None:
             payload["parameters"]["seed"] = int(seed)
 
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
+        headers = _build_headers(api_key)
 
         logger.info(
             "Calling Qwen-Image API model=%s size=%s prompt_extend=%s",
@@ -98,52 +133,59 @@ class QwenProvider(BaseProvider):
             prompt_extend,
         )
 
-        timeout = httpx.Timeout(self.timeout_seconds)
+        # Reuse the pooled keep-alive client instead of a TLS handshake per call.
+        client = get_http_client()
+        try:
+            # Headers already carry Content-Type; orjson encodes far faster than
+            # httpx's stdlib json path.
+            response = await client.post(
+                self.endpoint,
+                content=orjson.dumps(payload),
+                headers=headers,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            details = exc.response.text if exc.response is not None else str(exc)
+            raise RuntimeError(
+                f"Qwen-Image request failed: {details}"
+            ) from exc
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                response = await client.post(
-                    self.endpoint, json=payload, headers=headers
-                )
-                response.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                details = exc.response.text if exc.response is not None else str(exc)
-                raise RuntimeError(
-                    f"Qwen-Image request failed: {details}"
-                ) from exc
-
-            body = response.json()
-
-            error_code = body.get("code")
-            if error_code:
-                message = body.get("message") or body
-                raise RuntimeError(
-                    f"Qwen-Image request failed: {message} (code={error_code})"
-                )
-
-            # Extract image URL from response
-            images = self._extract_images(body)
-            if not images:
-                raise RuntimeError(
-                    f"No images returned from Qwen-Image: {body}"
-                )
-
-            metadata = {
-                "provider": self.name,
-                "model": payload["model"],
-                "size": size,
-                "mode": "text2image",
-                "usage": body.get("usage"),
-                "request_id": body.get("request_id"),
-            }
-
-            return {
-                "status": "success",
-                "task_id": str(request.task_id or uuid.uuid4()),
-                "images": images,
-                "image_url": images[0] if images else "",
-                "metadata": metadata,
-            }
+        # DashScope is shared with Wan; on HTTP/2 both multiplex one connection.
+        logger.debug("Qwen-Image response protocol=%s", response.http_version)
+
+        body = orjson.loads(response.content)
+
+        error_code = body.get("code")
+        if error_code:
+            message = body.get("message") or body
+            raise RuntimeError(
+                f"Qwen-Image request failed: {message} (code={error_code})"
+            )
+
+        # Extract image URL from response
+        images = self._extract_images(body)
+        if not images:
+            raise RuntimeError(
+                f"No images returned from Qwen-Image: {body}"
+            )
+
+        metadata = {
+            "provider": self.name,
+            "model": payload["model"],
+            "size": size,
+            "mode": "text2image",
+            "usage": body.get("usage"),
+            "request_id": body.get("request_id"),
+        }
+
+        return {
+            "status": "success",
+            "task_id": request.task_id_str,
+            "images": images,
+            "image_url": images[0] if images else "",
+            "metadata": metadata,
+        }
 
     def _extract_images(self, body: Dict[str, Any]) -> list[str]:
         """Extract image URLs from Qwen-Image response."""
@@ -176,33 +218,18 @@ class QwenProvider(BaseProvider):
         - 928*1664 (9:16)
         Any other input will be mapped到最接近的合法尺寸，防止 API 返回 InvalidParameter。
         """
-        allowed_sizes = {
-            "1664*928",
-            "1472*1140",
-            "1328*1328",
-            "1140*1472",
-            "928*1664",
-        }
-
         # Normalize separators
         raw = (size or "").strip()
         normalized = raw.replace("×", "x").replace("X", "x")
         size_lower = normalized.lower().replace("x", "*")
 
         # Direct hit
-        if size_lower in allowed_sizes:
+        if size_lower in _ALLOWED_SIZES:
             return size_lower
 
         # Common aspect ratios
-        ratio_map = {
-            "16:9": "1664*928",
-            "4:3": "1472*1140",
-            "1:1": "1328*1328",
-            "3:4": "1140*1472",
-            "9:16": "928*1664",
-        }
-        if normalized in ratio_map:
-            return ratio_map[normalized]
+        if normalized in _RATIO_SIZES:
+            return _RATIO_SIZES[normalized]
 
         # Parse WxH / W*H and map to nearest allowed size
         if "*" in size_lower:
@@ -211,19 +238,10 @@ class QwenProvider(BaseProvider):
                 width = int(width_str.strip())
                 height = int(height_str.strip())
                 if height == 0:
-                    return "1328*1328"
-                ratio = width / height
-                if ratio >= 1.5:  # 16:9 or wider
-                    return "1664*928"
-                if ratio >= 1.2:  # 4:3
-                    return "1472*1140"
-                if ratio >= 0.9:  # 1:1
-                    return "1328*1328"
-                if ratio >= 0.6:  # 3:4
-                    return "1140*1472"
-                return "928*1664"  # 9:16 or taller
+                    return _DEFAULT_SIZE
+                return _THRESHOLD_SIZES[bisect.bisect_right(_RATIO_THRESHOLDS, width / height)]
             except (ValueError, IndexError):
                 logger.debug("Qwen size parse failed for '%s', using default", size)
 
         # Default safest size
-        return "1328*1328"
+        return _DEFAULT_SIZE
@@ -9,21 +9,112 @@ are ready, returning a simple dict with image URLs for the pipeline.
 from __future__ import annotations
 
 import asyncio
-import base64
+import bisect
 import logging
+import math
+import multiprocessing
 import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from io import BytesIO
-from typing import Any, Dict, Optional, Sequence, Tuple
-from uuid import uuid4
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import httpx
+import orjson
 from PIL import Image
 
-from services.generate.adapters.base import BaseProvider
+from services.common.http import get_http_client
+from services.generate.adapters.base import BaseProvider, validate_request
 from services.generate.models import GenerateRequestPayload
 
 logger = logging.getLogger(__name__)
 
+# Supported aspect ratios, sorted by width / height for bisection.
+_RATIO_KEYS = ("9:16", "3:4", "1:1", "4:3", "16:9")
+_RATIO_VALUES = (9 / 16, 3 / 4, 1.0, 4 / 3, 16 / 9)
+# Preference when a ratio sits exactly between two entries.
+_RATIO_TIE_ORDER = ("1:1", "16:9", "9:16", "4:3", "3:4")
+
+# Supported output sizes per aspect ratio, by model family.
+_QWEN_FIXED_SIZES: Dict[str, Tuple[int, int]] = {
+    "1:1": (1328, 1328),
+    "16:9": (1664, 928),
+    "9:16": (928, 1664),
+    "4:3": (1472, 1140),
+    "3:4": (1140, 1472),
+}
+_WAN_DEFAULT_SIZES: Dict[str, Tuple[int, int]] = {
+    "1:1": (1024, 1024),
+    "16:9": (1440, 810),
+    "9:16": (810, 1440),
+    "4:3": (1440, 1080),
+    "3:4": (1080, 1440),
+}
+
+# Upper bound on JPEG encodes when shrinking one reference image.
+_MAX_COMPRESSION_ENCODES = 3
+
+# PIL holds the GIL for much of its work, so large reference images are
+# recompressed in a small process pool shared by all WanProvider instances.
+_COMPRESS_POOL: Optional[ProcessPoolExecutor] = None
+_COMPRESS_POOL_DISABLED = False
+_COMPRESS_POOL_LOCK = threading.Lock()
+
+try:  # Optional: pybase64 is a SIMD drop-in for the stdlib base64 API
+    import pybase64 as _base64
+except ImportError:  # pragma: no cover - optional dependency
+    import base64 as _base64
+
+try:  # Optional: pysimdjson parses lazily and only builds objects for accessed keys
+    import simdjson as _simdjson
+except ImportError:  # pragma: no cover - optional dependency
+    _simdjson = None
+
+
+def _parse_poll_body(content: bytes) -> Tuple[str, List[Any]]:
+    """Return ``(task_status, results)`` from a task-poll response as plain values.
+
+    With pysimdjson each call gets its own parser and only the fields read are
+    materialised. The lazy proxies never leave this function, so a parser is
+    never reused while another poll still references its document.
+    """
+    if _simdjson is None:
+        body = orjson.loads(content)
+    else:
+        body = _simdjson.Parser().parse(content)
+    output = body.get("output") or {}
+    status = str(output.get("task_status") or body.get("status") or "").upper()
+    if status != "SUCCEEDED":
+        return status, []
+    results = output.get("results") or []
+    if _simdjson is not None and isinstance(results, _simdjson.Array):
+        results = results.as_list()
+    return status, list(results)
+
+
+@lru_cache(maxsize=1)
+def _resolve_api_key() -> Optional[str]:
+    """Read the DashScope key once; call ``cache_clear()`` after rotating it."""
+    return os.getenv("DASHSCOPE_API_KEY") or os.getenv("WAN_API_KEY")
+
+
+@lru_cache(maxsize=4)
+def _build_headers(api_key: str) -> Tuple[Mapping[str, str], Mapping[str, str]]:
+    """Read-only (submit, poll) headers for a key; httpx copies them per request."""
+    authorization = f"Bearer {api_key}"
+    submit_headers = MappingProxyType(
+        {
+            "Authorization": authorization,
+            "Content-Type": "application/json",
+            "X-DashScope-Async": "enable",
+        }
+    )
+    return submit_headers, MappingProxyType({"Authorization": authorization})
+
 
 class WanProvider(BaseProvider):
     """Alibaba Cloud Tongyi Wanxiang (Wan) image generation adapter."""
@@ -38,7 +129,10 @@ class WanProvider(BaseProvider):
     )
     task_endpoint = "https://dashscope.aliyuncs.com/api/v1/tasks/{task_id}"
     timeout_seconds = 30.0
-    poll_interval = 2.0
+    # Polling starts quickly and backs off: most tasks finish within 6-15s.
+    poll_interval = 1.0
+    poll_backoff = 1.5
+    poll_max_interval = 5.0
     poll_timeout = 90.0
 
     async def generate(self, request: GenerateRequestPayload) -> Dict[str, Any]:
@@ -47,7 +141,8 @@ class WanProvider(BaseProvider):
         Decides t2i vs i2i automatically using ``params.reference_images``
         or the ``task`` name.
         """
-        api_key = os.getenv("DASHSCOPE_API_KEY") or os.getenv("WAN_API_KEY")
+        validate_request(request)
+        api_key = _resolve_api_key()
         if not api_key:
             raise RuntimeError("Missing DASHSCOPE_API_KEY for Tongyi Wanxiang integration.")
 
@@ -71,7 +166,8 @@ class WanProvider(BaseProvider):
             height_px,
             model=model,
         )
-        size = self._format_size(resolved_width, resolved_height)
+        # DashScope expects "W*H".
+        size = f"{resolved_width}*{resolved_height}"
         if (width_px, height_px) != (resolved_width, resolved_height):
             logger.debug(
                 "Wanxiang adjusted size from %sx%s to %sx%s for model=%s",
@@ -83,7 +179,17 @@ class WanProvider(BaseProvider):
             )
 
         if is_image_to_image:
-            images_payload = [self._encode_reference(item) for item in reference_images]
+            # Identical references (e.g. a style image repeated per variation) are
+            # encoded/compressed once and reused.
+            unique_refs = list(dict.fromkeys(reference_images))
+            encoded_refs = dict(
+                zip(
+                    unique_refs,
+                    await asyncio.gather(*(self._encode_reference(item) for item in unique_refs)),
+                    strict=True,
+                )
+            )
+            images_payload = [encoded_refs[item] for item in reference_images]
             payload = {
                 "model": model,
                 "input": {
@@ -107,11 +213,7 @@ class WanProvider(BaseProvider):
             }
             submit_url = request.params.get("endpoint", self.submit_endpoint)
 
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "X-DashScope-Async": "enable",
-        }
+        headers, poll_headers = _build_headers(api_key)
 
         timeout = httpx.Timeout(self.timeout_seconds)
 
@@ -122,26 +224,28 @@ class WanProvider(BaseProvider):
             size,
         )
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                submit_resp = await client.post(submit_url, json=payload, headers=headers)
-                submit_resp.raise_for_status()
-            except httpx.HTTPStatusError as exc:  # noqa: PERF203
-                details = exc.response.text if exc.response is not None else str(exc)
-                raise RuntimeError(f"Wanxiang submission failed: {details}") from exc
-
-            submit_body = submit_resp.json()
-
-            task_id = self._extract_task_id(submit_body)
-            if not task_id:
-                raise RuntimeError(f"Failed to obtain task_id from Wanxiang response: {submit_body}")
-
-            poll_headers = {"Authorization": headers["Authorization"]}
-            images = await self._poll_results(
-                client=client,
-                task_id=task_id,
-                headers=poll_headers,
-            )
+        # Submission and polling share the pooled keep-alive client, so polls reuse
+        # the already-established TLS connection to DashScope.
+        client = get_http_client()
+        try:
+            submit_resp = await client.post(submit_url, json=payload, headers=headers, timeout=timeout)
+            submit_resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:  # noqa: PERF203
+            details = exc.response.text if exc.response is not None else str(exc)
+            raise RuntimeError(f"Wanxiang submission failed: {details}") from exc
+
+        submit_body = orjson.loads(submit_resp.content)
+
+        task_id = self._extract_task_id(submit_body)
+        if not task_id:
+            raise RuntimeError(f"Failed to obtain task_id from Wanxiang response: {submit_body}")
+
+        images = await self._poll_results(
+            client=client,
+            task_id=task_id,
+            headers=poll_headers,
+            timeout=timeout,
+        )
 
         metadata: Dict[str, Any] = {
             "provider": self.name,
@@ -154,7 +258,7 @@ class WanProvider(BaseProvider):
 
         return {
             "status": "success",
-            "task_id": str(request.task_id or uuid4()),
+            "task_id": request.task_id_str,
             "images": images,
             "image_url": images[0] if images else "",
             "metadata": metadata,
@@ -165,20 +269,21 @@ class WanProvider(BaseProvider):
         *,
         client: httpx.AsyncClient,
         task_id: str,
-        headers: Dict[str, str],
+        headers: Mapping[str, str],
+        timeout: httpx.Timeout,
     ) -> list[str]:
         """Poll DashScope task endpoint until images are returned."""
         elapsed = 0.0
+        delay = self.poll_interval
         poll_url = self.task_endpoint.format(task_id=task_id)
         while elapsed <= self.poll_timeout:
-            response = await client.get(poll_url, headers=headers)
+            response = await client.get(poll_url, headers=headers, timeout=timeout)
             response.raise_for_status()
-            body = response.json()
-            output = body.get("output") or {}
-            status = (output.get("task_status") or body.get("status") or "").upper()
+            # Polls mostly only need task_status; only plain values come back, so
+            # nothing tied to a lazy parser is held across the sleep below.
+            status, results = _parse_poll_body(response.content)
 
             if status == "SUCCEEDED":
-                results = output.get("results") or []
                 images = []
                 for item in results:
                     if item.get("url"):
@@ -188,25 +293,23 @@ class WanProvider(BaseProvider):
                 return images
 
             if status == "FAILED":
-                raise RuntimeError(f"Wanxiang task failed: {body}")
+                raise RuntimeError(f"Wanxiang task failed: {response.text}")
 
-            await asyncio.sleep(self.poll_interval)
-            elapsed += self.poll_interval
+            await asyncio.sleep(delay + random.random() * 0.2)
+            elapsed += delay
+            delay = min(delay * self.poll_backoff, self.poll_max_interval)
 
         raise RuntimeError("Wanxiang task polling timed out")
 
-    def _format_size(self, width: int, height: int) -> str:
-        """Format width/height into DashScope expected 'W*H' string."""
-        return f"{width}*{height}"
-
     def _parse_size(self, size: str) -> Tuple[int, int]:
         """Parse WxH or W*H strings into integers."""
-        token = size.lower().replace("x", "*")
         try:
-            width_str, height_str = token.split("*", 1)
+            # Split on whichever separator is present instead of normalising a copy.
+            sep = "x" if "x" in size else ("X" if "X" in size else "*")
+            width_str, height_str = size.split(sep, 1)
             width = max(1, int(width_str.strip()))
             height = max(1, int(height_str.strip()))
-        except (ValueError, AttributeError):
+        except (ValueError, AttributeError, TypeError):
             logger.warning("无法解析尺寸 %s，使用默认 1024x1024", size)
             return (1024, 1024)
         return (width, height)
@@ -216,45 +319,26 @@ class WanProvider(BaseProvider):
         ratio_key = self._match_ratio(width, height)
         model_lower = (model or "").lower()
 
-        qwen_fixed_sizes: Dict[str, Tuple[int, int]] = {
-            "1:1": (1328, 1328),
-            "16:9": (1664, 928),
-            "9:16": (928, 1664),
-            "4:3": (1472, 1140),
-            "3:4": (1140, 1472),
-        }
-        wan_default_sizes: Dict[str, Tuple[int, int]] = {
-            "1:1": (1024, 1024),
-            "16:9": (1440, 810),
-            "9:16": (810, 1440),
-            "4:3": (1440, 1080),
-            "3:4": (1080, 1440),
-        }
-
-        if "wan" in model_lower or "wanxiang" in model_lower:
-            return wan_default_sizes.get(ratio_key, wan_default_sizes["1:1"])
-        return qwen_fixed_sizes.get(ratio_key, qwen_fixed_sizes["1:1"])
+        table = _WAN_DEFAULT_SIZES if "wan" in model_lower else _QWEN_FIXED_SIZES
+        return table.get(ratio_key, table["1:1"])
 
     def _match_ratio(self, width: int, height: int) -> str:
         """Approximate common aspect ratios."""
         if height == 0:
             return "1:1"
         ratio = width / height
-        ratio_map: Dict[str, float] = {
-            "1:1": 1.0,
-            "16:9": 16 / 9,
-            "9:16": 9 / 16,
-            "4:3": 4 / 3,
-            "3:4": 3 / 4,
-        }
-        best = "1:1"
-        best_delta = float("inf")
-        for key, target in ratio_map.items():
-            delta = abs(ratio - target)
-            if delta < best_delta:
-                best = key
-                best_delta = delta
-        return best
+        # Nearest of the two neighbouring entries in the sorted ratio table.
+        index = bisect.bisect(_RATIO_VALUES, ratio)
+        if index == 0:
+            return _RATIO_KEYS[0]
+        if index == len(_RATIO_VALUES):
+            return _RATIO_KEYS[-1]
+        lower, upper = _RATIO_KEYS[index - 1], _RATIO_KEYS[index]
+        delta_lower = ratio - _RATIO_VALUES[index - 1]
+        delta_upper = _RATIO_VALUES[index] - ratio
+        if delta_lower == delta_upper:
+            return min(lower, upper, key=_RATIO_TIE_ORDER.index)
+        return lower if delta_lower < delta_upper else upper
 
     def _extract_task_id(self, body: Dict[str, Any]) -> Optional[str]:
         """Extract task id from a submission response body."""
@@ -269,71 +353,130 @@ class WanProvider(BaseProvider):
             return b64_payload
         return f"data:image/png;base64,{b64_payload}"
 
-    def _encode_reference(self, image: str) -> str:
+    async def _encode_reference(self, image: str) -> str:
         """Coerce a reference image to API expected format (URL or data URL string)."""
         if image.startswith("data:"):
-            # Extract base64 data, compress if needed, then rebuild data URL
+            # Extract base64 data, compress if needed, then rebuild data URL.
             header, _, encoded = image.partition(",")
-            compressed = self._compress_base64_if_needed(encoded)
+            # The base64 length bounds the decoded size from above, so small images
+            # skip the decode (and the executor hop) entirely.
+            if len(encoded) * 3 // 4 <= self.max_reference_image_bytes:
+                return image
+            # Decoding and PIL re-encoding are CPU-bound; run them in the shared
+            # process pool (or the default thread pool when processes are unavailable).
+            loop = asyncio.get_running_loop()
+            pool = _get_compress_pool()
+            try:
+                compressed, message = await loop.run_in_executor(
+                    pool, _compress_reference_worker, encoded, self.max_reference_image_bytes
+                )
+            except BrokenProcessPool:
+                logger.warning("Compression process pool broke; compressing in a thread.")
+                if pool is not None:
+                    _discard_compress_pool(pool)
+                compressed, message = await loop.run_in_executor(
+                    None, _compress_reference_worker, encoded, self.max_reference_image_bytes
+                )
+            if compressed is None:
+                if message:
+                    logger.warning(message)
+                return image
+            logger.info(message)
             return f"{header},{compressed}"
         return image
 
-    def _compress_base64_if_needed(self, encoded: str) -> str:
-        """Reduce base64 images that would exceed DashScope payload limits."""
-        try:
-            raw = base64.b64decode(encoded, validate=False)
-        except Exception:  # noqa: BLE001
-            logger.warning("Failed to decode base64 reference image; sending original payload.")
-            return encoded
-
-        original_size = len(raw)
-        if original_size <= self.max_reference_image_bytes:
-            return encoded
 
-        compressed = self._compress_image_bytes(raw, max_bytes=self.max_reference_image_bytes)
-        if compressed is None:
-            logger.warning("Reference image compression failed; falling back to original bytes.")
-            return encoded
-
-        logger.info(
-            "Compressed reference image from %.2fMB to %.2fMB",
-            original_size / (1024 * 1024),
-            len(compressed) / (1024 * 1024),
-        )
-        return base64.b64encode(compressed).decode("utf-8")
-
-    def _compress_image_bytes(self, image_bytes: bytes, *, max_bytes: int) -> Optional[bytes]:
-        """Iteratively downscale/adjust quality until under the byte limit."""
-        try:
-            with Image.open(BytesIO(image_bytes)) as img:
-                img = img.convert("RGB")
-
-                # First try reducing JPEG quality.
-                for quality in (85, 75, 65, 55, 50):
-                    buffer = BytesIO()
-                    img.save(buffer, format="JPEG", quality=quality, optimize=True)
-                    if buffer.tell() <= max_bytes:
-                        return buffer.getvalue()
-
-                # If still too large, progressively downscale and retry.
-                width, height = img.size
-                while width > 256 and height > 256:
-                    width = int(width * 0.8)
-                    height = int(height * 0.8)
-                    resized = img.resize((max(1, width), max(1, height)), Image.LANCZOS)
-                    for quality in (80, 70, 60, 50):
-                        buffer = BytesIO()
-                        resized.save(buffer, format="JPEG", quality=quality, optimize=True)
-                        if buffer.tell() <= max_bytes:
-                            return buffer.getvalue()
-
-                # Final attempt with aggressive compression.
+def _get_compress_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the shared compression pool; None when processes are unavailable."""
+    global _COMPRESS_POOL, _COMPRESS_POOL_DISABLED
+    with _COMPRESS_POOL_LOCK:
+        if _COMPRESS_POOL is None and not _COMPRESS_POOL_DISABLED:
+            # forkserver avoids forking a process that already runs logging/HTTP threads.
+            if "forkserver" not in multiprocessing.get_all_start_methods():
+                _COMPRESS_POOL_DISABLED = True
+                return None
+            try:
+                _COMPRESS_POOL = ProcessPoolExecutor(
+                    max_workers=min(4, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            except (OSError, ValueError) as exc:
+                logger.warning("Compression process pool unavailable, using threads: %s", exc)
+                _COMPRESS_POOL_DISABLED = True
+        return _COMPRESS_POOL
+
+
+def _discard_compress_pool(pool: ProcessPoolExecutor) -> None:
+    global _COMPRESS_POOL
+    with _COMPRESS_POOL_LOCK:
+        if _COMPRESS_POOL is pool:
+            _COMPRESS_POOL = None
+    pool.shutdown(wait=False)
+
+
+def _compress_reference_worker(encoded: str, max_bytes: int) -> Tuple[Optional[str], str]:
+    """Decode, shrink and re-encode a base64 reference image.
+
+    Module-level so it can be pickled into the compression process pool. Pool
+    workers have no logging configured, so instead of logging this returns
+    ``(new_base64, message)``; ``new_base64`` is None when the original payload
+    should be sent unchanged, and the caller logs ``message``.
+    """
+    try:
+        raw = _base64.b64decode(encoded, validate=False)
+    except Exception:  # noqa: BLE001
+        return None, "Failed to decode base64 reference image; sending original payload."
+
+    original_size = len(raw)
+    if original_size <= max_bytes:
+        return None, ""
+
+    compressed, error = _compress_image_worker(raw, max_bytes)
+    if compressed is None:
+        return None, f"Reference image compression failed ({error}); falling back to original bytes."
+
+    message = (
+        f"Compressed reference image from {original_size / (1024 * 1024):.2f}MB"
+        f" to {len(compressed) / (1024 * 1024):.2f}MB"
+    )
+    return _base64.b64encode(compressed).decode("ascii"), message
+
+
+def _compress_image_worker(image_bytes: bytes, max_bytes: int) -> Tuple[Optional[bytes], Optional[str]]:
+    """Re-encode as JPEG under the byte limit with at most three encodes.
+
+    Quality and scale are estimated up front from the size budget instead of
+    sweeping quality levels at every downscale step; if the first encode is
+    still too large the scale is halved, at most twice. Returns
+    ``(jpeg_bytes, None)`` on success or ``(None, reason)`` otherwise.
+    """
+    try:
+        with Image.open(BytesIO(image_bytes)) as img:
+            width, height = img.size
+
+            target_ratio = min(1.0, max_bytes / max(1, len(image_bytes)))
+            quality = max(40, min(85, int(85 * math.sqrt(target_ratio))))
+            scale = min(1.0, math.sqrt(target_ratio) / (quality / 85))
+
+            if img.format == "JPEG" and scale < 1.0:
+                # Let libjpeg(-turbo) downscale in the DCT domain while decoding;
+                # it never goes below the requested size, so the resize below
+                # still produces the exact target dimensions.
+                img.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+            img = img.convert("RGB")
+
+            for _ in range(_MAX_COMPRESSION_ENCODES):
+                if scale < 1.0:
+                    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+                    candidate = img.resize(size, Image.LANCZOS)
+                else:
+                    candidate = img
                 buffer = BytesIO()
-                img.save(buffer, format="JPEG", quality=40, optimize=True)
+                candidate.save(buffer, format="JPEG", quality=quality, optimize=True)
                 if buffer.tell() <= max_bytes:
-                    return buffer.getvalue()
-                return None
+                    return buffer.getvalue(), None
+                scale *= 0.5
+            return None, f"still above {max_bytes} bytes after {_MAX_COMPRESSION_ENCODES} encodes"
 
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Failed to process reference image for compression: %s", exc)
-            return None
+    except Exception as exc:  # noqa: BLE001
+        return None, f"failed to process image: {exc}"
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
-from uuid import UUID
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID, uuid4
 
 
 @dataclass(slots=True)
@@ -24,6 +24,27 @@ class GenerateRequestPayload:
     image_url: Optional[str] = None
     task_id: Optional[UUID] = None
 
+    @property
+    def task_id_str(self) -> str:
+        """返回字符串形式的任务 ID，未指定时临时生成一个。"""
+        task_id = self.task_id
+        if task_id is None:
+            return str(uuid4())
+        return task_id if isinstance(task_id, str) else str(task_id)
+
+
+# (类型, 属性名) -> 是否存在；同一请求类型的字段集合固定，探测一次即可，
+# 避免缺失字段时每次 getattr 都经由 AttributeError 回退
+_ATTR_PROBES: Dict[Tuple[type, str], bool] = {}
+
+
+def _optional_attr(obj: Any, name: str, default: Any) -> Any:
+    key = (type(obj), name)
+    present = _ATTR_PROBES.get(key)
+    if present is None:
+        present = _ATTR_PROBES[key] = hasattr(obj, name)
+    return getattr(obj, name) if present else default
+
 
 def from_gateway_request(
     *,
@@ -31,9 +52,10 @@ def from_gateway_request(
     request,
 ) -> GenerateRequestPayload:
     """将 gateway.schemas.GenerateRequest 转换为适配器 payload。"""
+    request_enhancement = request.enhancement
     enhancement = EnhancementOptions(
-        apply_clarity=getattr(request.enhancement, "apply_clarity", False),
-        apply_aesthetic=getattr(request.enhancement, "apply_aesthetic", False),
+        apply_clarity=_optional_attr(request_enhancement, "apply_clarity", False),
+        apply_aesthetic=_optional_attr(request_enhancement, "apply_aesthetic", False),
     )
 
     payload = GenerateRequestPayload(
@@ -43,7 +65,7 @@ def from_gateway_request(
         size=request.size,
         params=request.params or {},
         enhancement=enhancement,
-        image_url=getattr(request, "image_url", None),
+        image_url=_optional_attr(request, "image_url", None),
         task_id=task_id,
     )
     return payload
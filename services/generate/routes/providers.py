@@ -1,17 +1,39 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, List
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
 
 import httpx
 from fastapi import APIRouter
 
+from services.common.http import get_http_client
 from services.generate import list_providers
 from services.generate.routes.provider_info import PROVIDER_META
 
 
 router = APIRouter()
 
+# Probe results are reused for a short while so /api/providers does not hit
+# every upstream on each request: endpoint -> (is_active, expires_at).
+_STATUS_TTL_SECONDS = 30.0
+_STATUS_CACHE: Dict[str, Tuple[bool, float]] = {}
+# Probes to the same host run one at a time, so a burst of listings opens a
+# single connection per upstream instead of one per concurrent probe.
+_HOST_SEMAPHORES: Dict[str, asyncio.Semaphore] = {}
+_PROBE_TIMEOUT = httpx.Timeout(2.0, connect=1.0)
+_ACTIVE_STATUS_CODES = frozenset({200, 401, 403, 404})
+
+
+def _cached_status(endpoint: str) -> Optional[bool]:
+    cached = _STATUS_CACHE.get(endpoint)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
 
 async def _check_provider_status(endpoint: str | None, provider_name: str = "") -> bool:
     """Check if provider endpoint is accessible.
@@ -24,53 +46,93 @@ async def _check_provider_status(endpoint: str | None, provider_name: str = "")
 
     # Special handling for providers that require proxy
     if "api.openai.com" in endpoint:
-        # DALL-E requires proxy - assume active if endpoint is configured
-        import os
-        proxy = os.getenv("OPENAI_PROXY") or os.getenv("HTTP_PROXY")
-        # If no proxy, still mark as available (user can configure later)
+        # DALL-E requires proxy - assume active if endpoint is configured,
+        # even without a proxy (user can configure later)
         return True
 
-    try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            response = await client.get(endpoint)
-            return response.status_code in {200, 401, 403, 404}
-    except Exception:
-        return False
+    cached = _cached_status(endpoint)
+    if cached is not None:
+        return cached
+
+    host = urlsplit(endpoint).netloc
+    semaphore = _HOST_SEMAPHORES.get(host)
+    if semaphore is None:
+        semaphore = _HOST_SEMAPHORES[host] = asyncio.Semaphore(1)
+    async with semaphore:
+        # A probe that held the semaphore before us may have filled the cache.
+        cached = _cached_status(endpoint)
+        if cached is not None:
+            return cached
+
+        try:
+            # HEAD only needs the status line; fall back to GET for hosts that reject it.
+            client = get_http_client()
+            response = await client.head(endpoint, timeout=_PROBE_TIMEOUT)
+            if response.status_code == 405:
+                response = await client.get(endpoint, timeout=_PROBE_TIMEOUT)
+            is_active = response.status_code in _ACTIVE_STATUS_CODES
+        except Exception:
+            is_active = False
+
+        _STATUS_CACHE[endpoint] = (is_active, time.monotonic() + _STATUS_TTL_SECONDS)
+    return is_active
+
+
+@lru_cache(maxsize=64)
+def _base_bundle(name: str) -> Mapping[str, Any]:
+    """Static part of a provider's listing entry; only ``is_active`` varies per request."""
+    meta = PROVIDER_META.get(name, {})
+    return MappingProxyType(
+        {
+            "id": name,
+            "display_name": meta.get("display_name", name),
+            "description": meta.get("description", ""),
+            "category": meta.get("category", "general"),
+            "is_free": meta.get("is_free", False),
+            "is_active": False,
+            "icon": meta.get("icon"),
+            "endpoint": meta.get("endpoint"),
+            "latency_ms": None,
+        }
+    )
+
+
+@lru_cache(maxsize=64)
+def _sort_prefix(name: str) -> Tuple[bool, bool, str]:
+    """Static sort fields: (not is_free, is lab provider, display_name)."""
+    bundle = _base_bundle(name)
+    return (not bundle["is_free"], name.startswith("lab_"), bundle["display_name"])
 
 
 def _bundle_provider(name: str, is_active: bool) -> Dict[str, Any]:
-    meta = PROVIDER_META.get(name, {})
-    return {
-        "id": name,
-        "display_name": meta.get("display_name", name),
-        "description": meta.get("description", ""),
-        "category": meta.get("category", "general"),
-        "is_free": meta.get("is_free", False),
-        "is_active": is_active,
-        "icon": meta.get("icon"),
-        "endpoint": meta.get("endpoint"),
-        "latency_ms": None,
-    }
+    return {**_base_bundle(name), "is_active": is_active}
+
+
+def _sort_key(item: Dict[str, Any]) -> Tuple[bool, bool, bool, str]:
+    not_free, is_lab, display_name = _sort_prefix(item["id"])
+    return (not_free, not item["is_active"], is_lab, display_name)
 
 
 @router.get("/api/providers")
 async def list_registered_providers() -> Dict[str, Any]:
     provider_names: List[str] = list_providers()
-    status_checks = await asyncio.gather(
-        *(_check_provider_status(PROVIDER_META.get(name, {}).get("endpoint"), name)
-          for name in provider_names)
+    endpoints = [PROVIDER_META.get(name, {}).get("endpoint") for name in provider_names]
+    # Providers sharing a host (e.g. qwen and wan on DashScope) are probed once.
+    unique_endpoints = [endpoint for endpoint in dict.fromkeys(endpoints) if endpoint]
+    results = dict(
+        zip(
+            unique_endpoints,
+            await asyncio.gather(*(_check_provider_status(endpoint) for endpoint in unique_endpoints)),
+            strict=True,
+        )
     )
 
-    providers = [_bundle_provider(name, status) for name, status in zip(provider_names, status_checks)]
+    providers = [
+        _bundle_provider(name, results.get(endpoint, False))
+        for name, endpoint in zip(provider_names, endpoints, strict=True)
+    ]
 
-    providers.sort(
-        key=lambda item: (
-            not item["is_free"],
-            not item["is_active"],
-            item["id"].startswith("lab_"),
-            item["display_name"],
-        )
-    )
+    providers.sort(key=_sort_key)
 
     return {
         "status": "success",
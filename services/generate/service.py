@@ -3,8 +3,9 @@ from __future__ import annotations
 from uuid import UUID
 
 from gateway.schemas import GenerateRequest
-from services.common.models import GenerationResult
+from services.common.models import GeneratedImage, GenerationResult
 from services.generate import get_provider
+from services.generate.adapters import _cache
 from services.generate.models import from_gateway_request
 
 
@@ -19,7 +20,20 @@ class GenerationService:
     ) -> GenerationResult:
         provider = get_provider(request.provider)
         payload = from_gateway_request(task_id=task_id, request=request)
-        provider_response = await provider.generate(payload)
+        # 相同请求短时间内复用上一次的生成结果（重试、重复评估时免去远程调用）；
+        # 任务 ID 由本服务填充，不受缓存影响
+        cache_key = _cache.make_key(
+            (provider.name, payload.task, payload.prompt, payload.size, payload.image_url, payload.params)
+        )
+        if cache_key is None:
+            provider_response = await provider.generate(payload)
+        else:
+            provider_response = await _cache.cached(
+                cache_key,
+                _cache.DEFAULT_TTL,
+                lambda: provider.generate(payload),
+                should_cache=_is_cacheable,
+            )
 
         images = _normalize_images(
             provider_response,
@@ -30,19 +44,37 @@ class GenerationService:
         return GenerationResult(task_id=task_id, provider=provider.name, images=images)
 
 
-def _normalize_images(response: dict, *, provider_name: str, prompt: str):
-    from services.common.models import GeneratedImage
+def _is_cacheable(response: dict) -> bool:
+    """仅缓存真实生成结果；占位响应（如缺少密钥或请求失败）带有 note 标记。"""
+    metadata = response.get("metadata") or {}
+    return response.get("status") == "success" and not metadata.get("note")
 
+
+def _normalize_images(response: dict, *, provider_name: str, prompt: str):
     metadata = response.get("metadata") or {}
-    urls = []
-    if isinstance(response.get("images"), list):
-        urls.extend(response["images"])
-    if response.get("image_url"):
-        urls.append(response["image_url"])
+    candidates = response.get("images")
+    if not isinstance(candidates, list):
+        candidates = []
+    image_url = response.get("image_url")
+    if image_url:
+        candidates = [*candidates, image_url]
 
-    urls = [url for url in urls if isinstance(url, str) and url]
+    # 单次遍历完成过滤与去重：适配器通常把 images[0] 同时放在 image_url 中
+    seen = set()
+    images = []
+    for url in candidates:
+        if isinstance(url, str) and url and url not in seen:
+            seen.add(url)
+            images.append(
+                GeneratedImage(
+                    url=url,
+                    provider=provider_name,
+                    prompt=prompt,
+                    metadata=metadata,
+                )
+            )
 
-    if not urls:
+    if not images:
         # 返回至少一个占位图，避免后续流程中断
         return [
             GeneratedImage(
@@ -53,13 +85,4 @@ def _normalize_images(response: dict, *, provider_name: str, prompt: str):
             )
         ]
 
-    images = [
-        GeneratedImage(
-            url=url,
-            provider=provider_name,
-            prompt=prompt,
-            metadata=metadata,
-        )
-        for url in urls
-    ]
     return images
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import atexit
 import logging
-import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import orjson
 
 from .prompt_bank_cn import _resolve_path
 
 logger = logging.getLogger(__name__)
 
+# 攒批写回：累计到 FLUSH_BATCH_SIZE 条或距首条更新超过 FLUSH_INTERVAL 秒即落盘一次
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL = 5.0
+
 
 class AestheticFeedback:
     """模板权重反馈模块，基于美学分数异步更新 Prompt Bank。"""
@@ -25,7 +30,15 @@ class AestheticFeedback:
         self.bank_path = _resolve_path(bank_path)
         self.log_path = _resolve_path(log_path) if not Path(log_path).is_absolute() else Path(log_path)
         self.alpha = max(0.0, min(1.0, alpha))
-        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue[Tuple[str, float]]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+        self._flush_event = asyncio.Event()
+        # 解析后的 Prompt Bank 缓存，文件 mtime 变化（被外部修改）时重新读取
+        self._bank_cache: Optional[list[Dict[str, Any]]] = None
+        self._bank_mtime_ns = 0
+        self._bank_index: Dict[str, int] = {}
+        self._log_file: Optional[TextIO] = None
+        atexit.register(self._close_log)
         self._ensure_log_folder()
 
     def _ensure_log_folder(self) -> None:
@@ -33,57 +46,131 @@ class AestheticFeedback:
         log_dir.mkdir(parents=True, exist_ok=True)
 
     async def update(self, template_id: Optional[str], aesthetic_score: Optional[float]) -> None:
-        """异步更新模板权重，主流程中调用时无需 await。"""
+        """登记一次模板权重更新，由后台任务攒批写回，调用方无需等待落盘。"""
         if not template_id:
             logger.debug("模板 ID 为空，跳过权重更新。")
             return
         normalized = self._normalize_score(aesthetic_score)
+        queue = self._ensure_worker()
+        queue.put_nowait((template_id, normalized))
+        if queue.qsize() >= FLUSH_BATCH_SIZE:
+            self._flush_event.set()
+
+    def _ensure_worker(self) -> asyncio.Queue[Tuple[str, float]]:
+        # 事件循环结束时后台任务会被取消，下一个循环中按需重建
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._flush_event = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run_worker(self._queue))
+        assert self._queue is not None
+        return self._queue
+
+    async def _run_worker(self, queue: asyncio.Queue[Tuple[str, float]]) -> None:
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._update_sync, template_id, normalized)
+        flush_event = self._flush_event
+        pending: List[Tuple[str, float]] = []
+        flushing: Optional[asyncio.Future[None]] = None
+        try:
+            while True:
+                pending.append(await queue.get())
+                if queue.qsize() + 1 < FLUSH_BATCH_SIZE:
+                    # 等待攒满一批或超时，先到者触发落盘
+                    timer = loop.call_later(FLUSH_INTERVAL, flush_event.set)
+                    try:
+                        await flush_event.wait()
+                    finally:
+                        timer.cancel()
+                flush_event.clear()
+                while not queue.empty():
+                    pending.append(queue.get_nowait())
+                batch, pending = pending, []
+                # 文件读写放到线程中，避免阻塞事件循环；只有本任务提交落盘且逐批等待完成，
+                # 写入天然串行，无需加锁。使用 run_in_executor 返回的 Future 而非 Task，
+                # 事件循环关闭时不会被一并取消
+                flushing = loop.run_in_executor(None, self._apply_updates, batch)
+                await asyncio.shield(flushing)
+                flushing = None
+        except asyncio.CancelledError:
+            # 关闭时先等进行中的落盘完成，再把尚未落盘的更新写回，避免丢失或并发写文件
+            if flushing is not None and not flushing.done():
+                await flushing
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            if pending:
+                self._apply_updates(pending)
+            raise
 
-    def _update_sync(self, template_id: str, score: float) -> None:
+    def _apply_updates(self, updates: List[Tuple[str, float]]) -> None:
+        """一次读取、按序应用全部更新、一次写回。"""
         try:
-            with self._lock:
-                bank = self._load_bank()
-                updated = False
-                for entry in bank:
-                    if entry.get("id") == template_id:
-                        old_weight = float(entry.get("权重") or 0.5)
-                        new_weight = self.alpha * old_weight + (1 - self.alpha) * score
-                        entry["权重"] = round(float(new_weight), 6)
-                        updated = True
-                        self._append_log(template_id, old_weight, entry["权重"], score)
-                        break
-                if updated:
-                    self._save_bank(bank)
-                else:
+            bank = self._load_bank()
+            updated = False
+            log_lines: List[str] = []
+            for template_id, score in updates:
+                index = self._bank_index.get(template_id)
+                if index is None:
                     logger.warning("在 PromptBank 中未找到模板 %s", template_id)
+                    continue
+                entry = bank[index]
+                old_weight = float(entry.get("权重") or 0.5)
+                new_weight = self.alpha * old_weight + (1 - self.alpha) * score
+                entry["权重"] = round(float(new_weight), 6)
+                updated = True
+                log_lines.append(self._format_log(template_id, old_weight, entry["权重"], score))
+            if log_lines:
+                self._append_log(log_lines)
+            if updated:
+                self._save_bank(bank)
         except Exception as exc:  # pragma: no cover - 保护日志写入
+            # 缓存可能已被部分修改，下次从文件重新加载
+            self._bank_cache = None
             logger.exception("更新模板权重失败: %s", exc)
 
     def _load_bank(self) -> list[Dict[str, Any]]:
         if not self.bank_path.exists():
             raise FileNotFoundError(f"Prompt bank 文件不存在: {self.bank_path}")
-        with self.bank_path.open("r", encoding="utf-8") as file:
-            data = json.load(file)
+        mtime_ns = self.bank_path.stat().st_mtime_ns
+        if self._bank_cache is not None and mtime_ns == self._bank_mtime_ns:
+            return self._bank_cache
+        data = orjson.loads(self.bank_path.read_bytes())
         if not isinstance(data, list):
             raise ValueError("Prompt bank 数据格式错误，应为数组。")
+        # id -> 列表下标；重复 id 以第一条为准，与原先的线性查找一致
+        index: Dict[str, int] = {}
+        for position, entry in enumerate(data):
+            if isinstance(entry, dict) and "id" in entry:
+                index.setdefault(entry["id"], position)
+        self._bank_cache = data
+        self._bank_index = index
+        self._bank_mtime_ns = mtime_ns
         return data
 
     def _save_bank(self, data: list[Dict[str, Any]]) -> None:
         tmp_path = self.bank_path.with_suffix(".tmp")
-        with tmp_path.open("w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         tmp_path.replace(self.bank_path)
+        self._bank_cache = data
+        self._bank_mtime_ns = self.bank_path.stat().st_mtime_ns
 
-    def _append_log(self, template_id: str, old_weight: float, new_weight: float, score: float) -> None:
+    @staticmethod
+    def _format_log(template_id: str, old_weight: float, new_weight: float, score: float) -> str:
         timestamp = datetime.now(timezone.utc).isoformat()
-        line = (
+        return (
             f"{timestamp}\ttemplate_id={template_id}\told={old_weight:.4f}"
             f"\tnew={new_weight:.4f}\tscore={score:.4f}\n"
         )
-        with self.log_path.open("a", encoding="utf-8") as log_file:
-            log_file.write(line)
+
+    def _append_log(self, lines: List[str]) -> None:
+        # 日志文件句柄在进程内常驻，每批更新一次写入并刷新
+        if self._log_file is None or self._log_file.closed:
+            self._log_file = self.log_path.open("a", encoding="utf-8")
+        self._log_file.writelines(lines)
+        self._log_file.flush()
+
+    def _close_log(self) -> None:
+        """进程退出时关闭当前打开的日志文件。"""
+        if self._log_file is not None and not self._log_file.closed:
+            self._log_file.close()
 
     @staticmethod
     def _normalize_score(score: Optional[float]) -> float:
@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-import json
 import logging
 import math
 import os
@@ -20,10 +19,17 @@ from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID, uuid4
 
 import httpx
+import orjson
 from pydantic import BaseModel, Field, model_validator
+
+try:  # Optional dependency
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
 from datetime import datetime
 from pathlib import Path
 
+from services.common.http import get_http_client
 from services.common.models import ComparativeReview, GeneratedImage
 from services.generate import get_provider
 from services.generate.models import GenerateRequestPayload
@@ -38,54 +44,140 @@ _DOUBAO_LOG_FILE = Path(os.getenv("DOUBAO_LOG_PATH", "logs/doubao_events.jsonl")
 _PIPELINE_LOG_FILE = Path(os.getenv("PIPELINE_LOG_PATH", "logs/pipeline_runs.jsonl"))
 # 默认的 ARK API 密钥
 DEFAULT_ARK_API_KEY = os.getenv("DEFAULT_ARK_API_KEY", "")
-# Vision API 并发限制（防止触发 429 Too Many Requests）
-_VISION_SEMAPHORE = asyncio.Semaphore(2)
+# Vision API 并发限制（防止触发 429 Too Many Requests）；进程内所有提供商、
+# 所有一致性检查共享同一上限，可通过 DOUBAO_MAX_INFLIGHT 调整
+_DEFAULT_VISION_MAX_INFLIGHT = 2
+
+
+def _read_vision_max_inflight() -> int:
+    """读取 DOUBAO_MAX_INFLIGHT；非法取值回退为默认值，小于 1 时按 1 处理"""
+    raw = os.getenv("DOUBAO_MAX_INFLIGHT")
+    if raw is None or not raw.strip():
+        return _DEFAULT_VISION_MAX_INFLIGHT
+    try:
+        value = int(raw)
+    except ValueError:
+        logger.warning(
+            "DOUBAO_MAX_INFLIGHT=%r 不是整数，使用默认值 %s", raw, _DEFAULT_VISION_MAX_INFLIGHT
+        )
+        return _DEFAULT_VISION_MAX_INFLIGHT
+    if value < 1:
+        logger.warning("DOUBAO_MAX_INFLIGHT=%s 小于 1，按 1 处理", value)
+        return 1
+    return value
+
+
+_VISION_MAX_INFLIGHT = _read_vision_max_inflight()
+_VISION_SEMAPHORE = asyncio.Semaphore(_VISION_MAX_INFLIGHT)
+# 一致性批量评估时单次请求携带的候选图数量上限
+_CONSISTENCY_BATCH_SIZE = 4
+# 一致性分数可能出现的字段名，以及需要优先深入搜索的嵌套字段
+_SCORE_KEYS = ("score", "similarity", "consistency", "consistency_score")
+_NESTED_SCORE_KEYS = ("output", "data", "answer", "response", "extra", "choices", "message", "messages")
+# 豆包聊天 API 中 base64 图片统一使用的 data URI 前缀
+_PNG_DATA_URL_PREFIX = "data:image/png;base64,"
+
+
+# 事件日志攒批：每批最多写入的行数、首条入队后的等待时间（秒）、队列上限（满时丢弃最旧记录）
+_EVENT_LOG_BATCH_SIZE = 64
+_EVENT_LOG_FLUSH_INTERVAL = 0.05
+_EVENT_LOG_QUEUE_SIZE = 10_000
+
+
+class _JsonlEventLog:
+    """JSONL 事件日志：记录在事件循环中入队，由后台任务按批追加写入文件。"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._queue: Optional[asyncio.Queue[bytes]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有事件循环（同步调用方）时直接写入
+            self._write_lines([line])
+            return
+        # 事件循环结束时后台任务会被取消，下一个循环中按需重建
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=_EVENT_LOG_QUEUE_SIZE)
+            self._worker = loop.create_task(self._run_worker(self._queue))
+        assert self._queue is not None
+        if self._queue.full():
+            self._queue.get_nowait()
+            logger.debug("Event log queue full, dropped oldest record for %s", self.path)
+        self._queue.put_nowait(line)
+
+    async def _run_worker(self, queue: asyncio.Queue[bytes]) -> None:
+        loop = asyncio.get_running_loop()
+        lines: List[bytes] = []
+        try:
+            while True:
+                lines.append(await queue.get())
+                if queue.qsize() + 1 < _EVENT_LOG_BATCH_SIZE:
+                    await asyncio.sleep(_EVENT_LOG_FLUSH_INTERVAL)
+                while not queue.empty() and len(lines) < _EVENT_LOG_BATCH_SIZE:
+                    lines.append(queue.get_nowait())
+                batch, lines = lines, []
+                # 文件写入放到线程池，避免阻塞事件循环
+                await loop.run_in_executor(None, self._write_lines, batch)
+        except asyncio.CancelledError:
+            # 关闭时把尚未写入的记录同步落盘
+            while not queue.empty():
+                lines.append(queue.get_nowait())
+            if lines:
+                self._write_lines(lines)
+            raise
+
+    def _write_lines(self, lines: List[bytes]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as handle:
+                handle.writelines(lines)
+        except Exception:  # noqa: BLE001
+            logger.debug("Failed to write event log %s", self.path, exc_info=True)
+
+
+_DOUBAO_EVENT_LOG = _JsonlEventLog(_DOUBAO_LOG_FILE)
+_PIPELINE_EVENT_LOG = _JsonlEventLog(_PIPELINE_LOG_FILE)
 
 
 def _record_doubao_event(event: str, payload: Dict[str, Any]) -> None:
-    """记录豆包 API 调用事件到日志文件
+    """记录豆包 API 调用事件到日志文件（异步攒批写入）
 
     Args:
         event: 事件类型（例如 "analysis_response", "consistency_response"）
         payload: 事件数据负载
     """
     try:
-        # 确保日志目录存在
-        _DOUBAO_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
         # 构建日志记录
         record = {
             "ts": datetime.utcnow().isoformat() + "Z",  # 时间戳
             "event": event,  # 事件类型
             "data": payload,  # 事件数据
         }
-        # 追加写入日志文件
-        with _DOUBAO_LOG_FILE.open("a", encoding="utf-8") as handle:
-            json.dump(record, handle, ensure_ascii=False)
-            handle.write("\n")
+        _DOUBAO_EVENT_LOG.write(record)
     except Exception:  # noqa: BLE001
         logger.debug("Failed to record Doubao event %s", event, exc_info=True)
 
 
 def _record_pipeline_event(event: str, payload: Dict[str, Any]) -> None:
-    """记录流程运行事件到日志文件
+    """记录流程运行事件到日志文件（异步攒批写入）
 
     Args:
         event: 事件类型（例如 "pipeline_summary", "provider_results"）
         payload: 事件数据负载
     """
     try:
-        # 确保日志目录存在
-        _PIPELINE_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
         # 构建日志记录
         record = {
             "ts": datetime.utcnow().isoformat() + "Z",  # 时间戳
             "event": event,  # 事件类型
             "data": payload,  # 事件数据
         }
-        # 追加写入日志文件
-        with _PIPELINE_LOG_FILE.open("a", encoding="utf-8") as handle:
-            json.dump(record, handle, ensure_ascii=False)
-            handle.write("\n")
+        _PIPELINE_EVENT_LOG.write(record)
     except Exception:  # noqa: BLE001
         logger.debug("Failed to record pipeline event %s", event, exc_info=True)
 
@@ -194,41 +286,35 @@ async def run_image2image_pipeline(payload: Image2ImagePipelineRequest) -> Dict[
         if not all_candidates:
             raise RuntimeError("生成阶段未返回任何候选图片")
 
-        def _candidate_score(item: GeneratedMarketingImage) -> float:
-            """获取候选图片的综合评分
-
-            Args:
-                item: 生成的营销图片对象
-
-            Returns:
-                综合评分（0.0-1.0），无评分时返回 0.0
-            """
-            evaluation_summary = (
-                item.evaluation.image_results.get(item.image.url)
-                if item.evaluation
-                else None
+        # 每个候选图的评估摘要只查询一次，排序、结果列表、对比点评与运行日志共用
+        annotated = [
+            (
+                candidate,
+                candidate.evaluation.image_results.get(candidate.image.url)
+                if candidate.evaluation
+                else None,
             )
-            return float(evaluation_summary.composite_score) if evaluation_summary else 0.0
+            for candidate in all_candidates
+        ]
 
         # 如果是组模式，按评分排序；否则保持原顺序
-        ordered_candidates = (
-            sorted(all_candidates, key=_candidate_score, reverse=True)
+        ordered = (
+            sorted(
+                annotated,
+                key=lambda item: float(item[1].composite_score) if item[1] else 0.0,
+                reverse=True,
+            )
             if group_mode
-            else all_candidates
+            else annotated
         )
+        ordered_candidates = [candidate for candidate, _ in ordered]
 
         # 构建返回给前端的结果列表
         results_payload = []
-        for candidate in ordered_candidates:
-            # 获取该候选图片的评估摘要
-            evaluation_summary = (
-                candidate.evaluation.image_results.get(candidate.image.url)
-                if candidate.evaluation
-                else None
-            )
+        for candidate, evaluation_summary in ordered:
             # 综合评分
             composite = evaluation_summary.composite_score if evaluation_summary else None
-        # 各模块的详细评分
+            # 各模块的详细评分
             scores: Dict[str, float] = {}
             if evaluation_summary:
                 # 返回除整体评分外的所有模块评分
@@ -268,9 +354,9 @@ async def run_image2image_pipeline(payload: Image2ImagePipelineRequest) -> Dict[
             # Extract GeneratedImage objects and evaluations for the reviewer
             imgs = [c.image for c in ordered_candidates]
             evals = {
-                c.image.url: c.evaluation.image_results[c.image.url]
-                for c in ordered_candidates
-                if c.evaluation and c.image.url in c.evaluation.image_results
+                candidate.image.url: summary
+                for candidate, summary in ordered
+                if summary is not None
             }
 
             if evals:
@@ -309,16 +395,12 @@ async def run_image2image_pipeline(payload: Image2ImagePipelineRequest) -> Dict[
                     {
                         "provider": candidate.provider,
                         "url": candidate.image.url,
-                        "composite_score": (
-                            candidate.evaluation.image_results.get(candidate.image.url).composite_score
-                            if candidate.evaluation and candidate.image.url in candidate.evaluation.image_results
-                            else None
-                        ),
+                        "composite_score": summary.composite_score if summary else None,
                         "verification": candidate.verification,
                         "sequence_index": candidate.image.metadata.get("sequence_index"),
                         "group_size": candidate.image.metadata.get("group_size"),
                     }
-                    for candidate in ordered_candidates
+                    for candidate, summary in ordered
                 ],
             },
         )
@@ -389,7 +471,7 @@ async def _generate_candidates(
         assert last_error
         raise last_error
 
-    for provider_id in providers:
+    async def _run_provider(provider_id: str) -> List[GeneratedMarketingImage]:
         provider = get_provider(provider_id)
         semaphore = provider_limits[provider_id]
         generated_images: List[GeneratedImage] = []
@@ -431,10 +513,15 @@ async def _generate_candidates(
                 runner=_execute_single,
             )
 
-        tasks = [asyncio.create_task(_generate_single()) for _ in range(capped_variations)]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 每个变体单独请求并发执行：Seedream 组图模式下 max_images 只是上限，
+        # 且返回的是一组关联图片而非相互独立的候选
+        results = await asyncio.gather(
+            *(_generate_single() for _ in range(capped_variations)),
+            return_exceptions=True,
+        )
 
-        for index, item in enumerate(results):
+        produced: List[GeneratedImage] = []
+        for item in results:
             if isinstance(item, Exception):
                 logger.warning(
                     "生成候选失败(provider=%s): %s",
@@ -443,10 +530,13 @@ async def _generate_candidates(
                     extra={"provider": provider.name},
                 )
                 continue
+            produced.append(item)
+
+        for index, item in enumerate(produced):
             base_metadata = dict(item.metadata or {})
             if group_mode:
                 base_metadata["sequence_index"] = index
-                base_metadata["group_size"] = capped_variations
+                base_metadata["group_size"] = len(produced)
             generated_images.append(
                 GeneratedImage(
                     url=item.url,
@@ -457,7 +547,7 @@ async def _generate_candidates(
             )
 
         if not generated_images:
-            continue
+            return []
 
         evaluation = await aggregator.score_candidates(
             task_id=task_id,
@@ -502,15 +592,32 @@ async def _generate_candidates(
             },
         )
 
-        for image in generated_images:
-            generated.append(
-                GeneratedMarketingImage(
-                    provider=provider.name,
-                    image=image,
-                    evaluation=evaluation,
-                    verification=verification.get(image.url, {}),
-                )
+        return [
+            GeneratedMarketingImage(
+                provider=provider.name,
+                image=image,
+                evaluation=evaluation,
+                verification=verification.get(image.url, {}),
             )
+            for image in generated_images
+        ]
+
+    # 各提供商相互独立，并发执行生成、评分与一致性校验，总耗时取决于最慢的提供商；
+    # 结果按 providers 的原始顺序合并
+    results = await asyncio.gather(
+        *(_run_provider(provider_id) for provider_id in providers),
+        return_exceptions=True,
+    )
+    for provider_id, result in zip(providers, results, strict=True):
+        if isinstance(result, Exception):
+            logger.warning(
+                "提供商候选流程失败(provider=%s): %s",
+                provider_id,
+                result,
+                extra={"provider": provider_id},
+            )
+            continue
+        generated.extend(result)
 
     return generated
 
@@ -524,6 +631,7 @@ async def _verify_consistency(
     """验证生成图片与参考图片的主体一致性
 
     使用豆包视觉理解 API 来评估每张生成图片与参考图片的主体是否一致。
+    多张候选图时按批合并为一次请求，批量结果缺失的图片再逐张请求。
     如果 API 调用失败，则使用占位符分数（0.0）。
     所有分数归一化到 [0, 1] 区间。
 
@@ -619,10 +727,66 @@ async def _verify_consistency(
             },
         )
 
-    tasks = [_check_single_image_with_retry(image) for image in generated_images]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def _check_batch(batch: Sequence[GeneratedImage]) -> List[Optional[float]]:
+        """一次请求评估一批候选图，遇到限流时与逐张检查相同地退避重试"""
+        async with _VISION_SEMAPHORE:
+            attempt = 0
+            while True:
+                try:
+                    return await _request_consistency_scores_batch(
+                        api_key=api_key,
+                        reference_images=reference_images,
+                        candidate_images=[image.url for image in batch],
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    if isinstance(exc, httpx.HTTPStatusError):
+                        rate_limited = exc.response.status_code == 429
+                    else:
+                        rate_limited = "429" in str(exc) or "rate limit" in str(exc).lower()
+                    # 限流时直接回退为逐张请求只会成倍放大负载，先退避重试
+                    if not rate_limited or attempt >= 2:
+                        raise
+                    backoff = 2 ** attempt
+                    logger.warning(
+                        "Rate limit hit (429) for consistency batch of %s images, retrying in %ss (attempt %s/3)",
+                        len(batch),
+                        backoff,
+                        attempt + 1,
+                    )
+                    await asyncio.sleep(backoff)
+                    attempt += 1
 
     verification: Dict[str, Dict[str, Any]] = {}
+    pending: Sequence[GeneratedImage] = generated_images
+    if len(generated_images) > 1:
+        # 参考图只需上传一次，N 张候选图的评估合并为 ceil(N / 批大小) 次往返
+        batches = [
+            generated_images[start:start + _CONSISTENCY_BATCH_SIZE]
+            for start in range(0, len(generated_images), _CONSISTENCY_BATCH_SIZE)
+        ]
+        batch_results = await asyncio.gather(
+            *(_check_batch(batch) for batch in batches),
+            return_exceptions=True,
+        )
+        for batch, batch_result in zip(batches, batch_results, strict=True):
+            if isinstance(batch_result, Exception):
+                logger.warning("批量一致性检查失败，回退为逐张检查: %s", batch_result)
+                continue
+            if len(batch_result) != len(batch):
+                logger.warning(
+                    "批量一致性结果数量不符(期望 %s，实际 %s)，回退为逐张检查",
+                    len(batch),
+                    len(batch_result),
+                )
+                continue
+            for image, score in zip(batch, batch_result, strict=True):
+                if score is not None:
+                    verification[image.url] = {"status": "scored", "score": score}
+        pending = [image for image in generated_images if image.url not in verification]
+
+    tasks = [_check_single_image_with_retry(image) for image in pending]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
     for result in results:
         if isinstance(result, Exception):
             logger.error("Unexpected error in consistency check: %s", result)
@@ -735,6 +899,8 @@ def _synthesize_embedding(reference_images: Sequence[str], dimension: int = 256)
     """
     if not reference_images:
         return None
+    if _np is not None:
+        return _synthesize_embedding_numpy(reference_images, dimension)
     # 初始化零向量
     vector = [0.0] * dimension
     # 遍历所有参考图片
@@ -755,6 +921,28 @@ def _synthesize_embedding(reference_images: Sequence[str], dimension: int = 256)
     return [value / norm for value in vector]
 
 
+def _synthesize_embedding_numpy(reference_images: Sequence[str], dimension: int) -> List[float]:
+    """``_synthesize_embedding`` 的 NumPy 向量化实现，结果与纯 Python 版本一致（仅有浮点舍入差异）"""
+    digest_size = hashlib.sha256().digest_size
+    digests: List[bytes] = []
+    offsets: List[int] = []
+    for img_index, image in enumerate(reference_images):
+        if not isinstance(image, str):
+            continue
+        digests.append(hashlib.sha256(image.encode("utf-8", "ignore")).digest())
+        offsets.append(img_index * digest_size)
+    if not digests:
+        return [0.0] * dimension
+    # 每个字节归一化到 [0, 1]，按位置累加（bincount 处理位置回绕后的重复累加）
+    values = _np.frombuffer(b"".join(digests), dtype=_np.uint8) / 255.0
+    positions = (_np.arange(digest_size) + _np.asarray(offsets)[:, None]).ravel() % dimension
+    vector = _np.bincount(positions, weights=values, minlength=dimension)
+    norm = float(_np.linalg.norm(vector))
+    if norm <= 0:
+        return vector.tolist()
+    return (vector / norm).tolist()
+
+
 async def _post_doubao(
     *,
     payload: Dict[str, Any],
@@ -782,9 +970,11 @@ async def _post_doubao(
         or os.getenv("ARK_CHAT_ENDPOINT")
         or "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
     )
-    # 创建异步 HTTP 客户端并发送请求（超时 30 秒）
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(url, json=payload, headers=headers)
+    # 复用进程级连接池发送请求（超时 30 秒），免去每次请求的 TCP/TLS 握手
+    # 请求体含大体积 base64 图片，用 orjson 编码；各调用方的请求头均已声明 JSON Content-Type
+    response = await get_http_client().post(
+        url, content=orjson.dumps(payload), headers=headers, timeout=30.0
+    )
     try:
         # 检查响应状态码，如果不是 2xx 则抛出异常
         response.raise_for_status()
@@ -799,7 +989,7 @@ async def _post_doubao(
             _redact_payload(payload),  # 脱敏处理（隐藏 base64 图片等敏感信息）
         )
         raise
-    return response.json()
+    return orjson.loads(response.content)
 
 
 def _summarize_image(source: str) -> Dict[str, Any]:
@@ -881,26 +1071,31 @@ def _build_chat_image_content(source: str) -> Optional[Dict[str, Any]]:
     Returns:
         豆包 API 的图片内容字典，如果来源无效则返回 None
     """
+    url = _chat_image_url(source)
+    if url is None:
+        return None
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": url,
+        },
+    }
+
+
+def _chat_image_url(source: str) -> Optional[str]:
+    """计算图片内容中的 URL；PNG data URI 原样返回，无需切分、拼接大体积字符串"""
     if not source:
         return None
     if source.startswith("data:"):
         # 如果是 base64 编码的图片
+        if source.startswith(_PNG_DATA_URL_PREFIX):
+            return source if len(source) > len(_PNG_DATA_URL_PREFIX) else None
         _, _, encoded = source.partition(",")
         if not encoded:
             return None
-        return {
-            "type": "image_url",
-            "image_url": {
-                "url": f"data:image/png;base64,{encoded}",
-            },
-        }
+        return f"{_PNG_DATA_URL_PREFIX}{encoded}"
     # 如果是普通 URL
-    return {
-        "type": "image_url",
-        "image_url": {
-            "url": source,
-        },
-    }
+    return source
 
 
 def _build_analysis_prompt(
@@ -958,6 +1153,26 @@ def _build_consistency_prompt(reference_images: Sequence[str], candidate_image:
     )
 
 
+def _build_batch_consistency_prompt(reference_count: int, candidate_count: int) -> str:
+    """构建多张候选图一次性评估的主体一致性 prompt
+
+    Args:
+        reference_count: 参考图片数量
+        candidate_count: 候选图片数量
+
+    Returns:
+        完整的 prompt 字符串
+    """
+    return (
+        "你是电商商品一致性审核助手。请逐一比较每张候选图片与参考图片的主体是否一致，"
+        "候选图需保持同类商品、主色调与关键特征。"
+        f"图像顺序：前 {reference_count} 张是参考图，其后 {candidate_count} 张依次是候选图。"
+        '请输出 JSON：{"scores": [{"index": 候选图序号（从 0 开始）, "score": 0-1 浮点（1 表示完全一致）, '
+        '"comment": 中文解释（不超过30字）}]}，每张候选图一项。'
+        "仅返回 JSON。"
+    )
+
+
 def _is_retryable_generation_error(exc: Exception) -> bool:
     """判断生成错误是否可重试
 
@@ -1017,10 +1232,10 @@ def _parse_analysis_response(payload: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(text, str):
             continue
         try:
-            parsed = json.loads(text)
+            parsed = orjson.loads(text)
             if isinstance(parsed, dict):
                 return parsed
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             continue
 
     return {}
@@ -1095,10 +1310,10 @@ def _parse_chat_completion(payload: Dict[str, Any]) -> Dict[str, Any]:
         if not text:
             continue
         try:
-            parsed = json.loads(text)
+            parsed = orjson.loads(text)
             if isinstance(parsed, dict):
                 return parsed
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             continue
     return {}
 
@@ -1200,6 +1415,87 @@ async def _request_consistency_score(
     return score
 
 
+async def _request_consistency_scores_batch(
+    *,
+    api_key: str,
+    reference_images: Sequence[str],
+    candidate_images: Sequence[str],
+) -> List[Optional[float]]:
+    """一次请求评估多张候选图片与参考图片的一致性
+
+    Args:
+        api_key: 豆包 API 密钥
+        reference_images: 参考图片列表
+        candidate_images: 候选图片 URL 列表
+
+    Returns:
+        与 candidate_images 一一对应的一致性分数（0.0-1.0），响应中缺失的项为 None
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    model = (
+        os.getenv("ARK_CONSISTENCY_MODEL")
+        or os.getenv("ARK_ANALYSIS_MODEL")
+        or "doubao-seed-1-6-251015"
+    )
+
+    # 消息内容：参考图、候选图（按序）、prompt
+    contents: List[Dict[str, Any]] = []
+    for image in reference_images:
+        chat_image = _build_chat_image_content(image)
+        if chat_image:
+            contents.append(chat_image)
+    # 无法编码的参考图会被跳过，prompt 中的参考图数量以实际放入的为准，否则候选图序号会错位
+    reference_count = len(contents)
+    for image in candidate_images:
+        chat_image = _build_chat_image_content(image)
+        if chat_image is None:
+            # 候选图无法编码时序号会错位，交由逐张检查处理
+            raise ValueError(f"无效的候选图片: {_summarize_image(image)}")
+        contents.append(chat_image)
+    contents.append(
+        {
+            "type": "text",
+            "text": _build_batch_consistency_prompt(reference_count, len(candidate_images)),
+        }
+    )
+
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": contents,
+            }
+        ],
+        "max_tokens": 100 + 100 * len(candidate_images),
+        "temperature": 0.0,
+        "top_p": 0.8,
+        "stream": False,
+        "response_format": {"type": "json_object"},
+    }
+
+    body = await _post_doubao(
+        payload=payload,
+        headers=headers,
+        endpoint="https://ark.cn-beijing.volces.com/api/v3/chat/completions",
+    )
+    _record_doubao_event("consistency_batch_response", body)
+    scores = _extract_consistency_scores_batch(body, len(candidate_images))
+    _record_doubao_event(
+        "consistency_batch_debug",
+        {
+            "model": model,
+            "reference_images": _summarize_images(reference_images),
+            "candidate_images": _summarize_images(candidate_images),
+            "scores": scores,
+        },
+    )
+    return scores
+
+
 def _prepare_doubao_image(source: str, index: int) -> Dict[str, Any]:
     """准备豆包 API 的图片输入格式（旧格式，已废弃）
 
@@ -1226,10 +1522,55 @@ def _prepare_doubao_image(source: str, index: int) -> Dict[str, Any]:
     }
 
 
+def _normalize_consistency_value(value: Any) -> Optional[float]:
+    """将分数值转换为浮点数，百分制分数归一化到 [0, 1]，无法解析时返回 None"""
+    try:
+        numeric = float(value)
+    except (TypeError, ValueError):
+        return None
+    # 如果分数大于1，可能是百分制，需要归一化
+    if numeric > 1.0:
+        if numeric <= 100.0:
+            numeric = numeric / 100.0
+        else:
+            # 超过100的值视为异常，限制为1.0
+            numeric = 1.0
+    return numeric
+
+
+def _extract_consistency_scores_batch(payload: Dict[str, Any], count: int) -> List[Optional[float]]:
+    """从批量一致性评估响应中提取每张候选图的分数
+
+    Args:
+        payload: 豆包 API 返回的原始响应
+        count: 候选图片数量
+
+    Returns:
+        长度为 count 的分数列表（0.0-1.0），缺失或无法解析的项为 None
+    """
+    scores: List[Optional[float]] = [None] * count
+    entries = _parse_chat_completion(payload).get("scores")
+    if not isinstance(entries, list):
+        return scores
+    for position, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            index = entry.get("index", position)
+            value = entry.get("score")
+        else:
+            index, value = position, entry
+        if not isinstance(index, int) or not 0 <= index < count:
+            continue
+        numeric = _normalize_consistency_value(value)
+        if numeric is not None:
+            scores[index] = max(0.0, min(1.0, numeric))
+    return scores
+
+
 def _extract_consistency_score(payload: Dict[str, Any]) -> Optional[float]:
-    """从豆包 API 响应中递归提取一致性分数
+    """从豆包 API 响应中提取一致性分数
 
-    这个函数会递归搜索响应中所有可能包含分数的字段。
+    常见的 Chat Completion 响应直接读取 choices[0].message.content；
+    其余情况按深度优先顺序搜索所有可能包含分数的字段。
     支持多种字段名和嵌套结构，以适应不同的响应格式。
 
     Args:
@@ -1238,68 +1579,70 @@ def _extract_consistency_score(payload: Dict[str, Any]) -> Optional[float]:
     Returns:
         提取出的一致性分数（0.0-1.0），失败时返回 None
     """
-    # 记录已访问的对象 ID，防止循环引用导致无限递归
-    seen: set[int] = set()
-
-    def _scan(obj: Any) -> Optional[float]:
-        """递归扫描对象以查找分数字段"""
-        obj_id = id(obj)
-        if obj_id in seen:
-            # 已经访问过这个对象，避免循环
-            return None
-        seen.add(obj_id)
+    fast = _score_from_chat_content(payload)
+    if fast is not None:
+        return fast
 
+    # 显式栈代替递归；子节点逆序入栈以保持原有的搜索顺序。
+    # 同一子对象可能经由具名键和“全部值”两条路径入栈，按 id 去重避免重复扫描
+    seen: set[int] = set()
+    stack: List[Any] = [payload]
+    while stack:
+        obj = stack.pop()
         if isinstance(obj, dict):
+            obj_id = id(obj)
+            if obj_id in seen:
+                continue
+            seen.add(obj_id)
+
             # 尝试直接从已知的分数字段获取值
-            for key in ("score", "similarity", "consistency", "consistency_score"):
+            for key in _SCORE_KEYS:
                 if key in obj:
-                    value = obj.get(key)
-                    try:
-                        numeric = float(value)
-                        # 如果分数大于1，可能是百分制，需要归一化
-                        if numeric > 1.0:
-                            if numeric <= 100.0:
-                                numeric = numeric / 100.0
-                            else:
-                                # 超过100的值视为异常，限制为1.0
-                                numeric = 1.0
+                    numeric = _normalize_consistency_value(obj[key])
+                    if numeric is not None:
                         return numeric
-                    except (TypeError, ValueError):
-                        continue
 
+            children: List[Any] = []
             # 尝试从文本字段中解析 JSON
             text_value = obj.get("text") or obj.get("content") or obj.get("result")
             if isinstance(text_value, str):
                 try:
-                    parsed = json.loads(text_value)
-                    value = _scan(parsed)
-                    if value is not None:
-                        return value
-                except json.JSONDecodeError:
+                    children.append(orjson.loads(text_value))
+                except orjson.JSONDecodeError:
                     pass
+            # 已知的嵌套字段优先，其后兜底扫描所有值，防止遗漏未列出的键
+            children.extend(obj.get(key) for key in _NESTED_SCORE_KEYS)
+            children.extend(obj.values())
+            stack.extend(reversed(children))
+        elif isinstance(obj, list):
+            obj_id = id(obj)
+            if obj_id in seen:
+                continue
+            seen.add(obj_id)
+            stack.extend(reversed(obj))
+    return None
 
-            # 递归搜索嵌套字段
-            for nested_key in ("output", "data", "answer", "response", "extra", "choices", "message", "messages"):
-                nested = obj.get(nested_key)
-                value = _scan(nested)
-                if value is not None:
-                    return value
-
-            # 兜底：递归扫描所有值，防止遗漏未列出的键
-            for value in obj.values():
-                scanned = _scan(value)
-                if scanned is not None:
-                    return scanned
 
-        elif isinstance(obj, list):
-            # 递归搜索列表中的每个元素
-            for item in obj:
-                value = _scan(item)
-                if value is not None:
-                    return value
+def _score_from_chat_content(payload: Dict[str, Any]) -> Optional[float]:
+    """快速路径：choices[0].message.content 为直接包含分数字段的 JSON 对象"""
+    try:
+        content = payload["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
         return None
-
-    return _scan(payload)
+    if not isinstance(content, str):
+        return None
+    try:
+        parsed = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    for key in _SCORE_KEYS:
+        if key in parsed:
+            numeric = _normalize_consistency_value(parsed[key])
+            if numeric is not None:
+                return numeric
+    return None
 
 
 def _extract_urls(response: Dict[str, Any]) -> List[str]:
@@ -1319,9 +1662,10 @@ def _extract_urls(response: Dict[str, Any]) -> List[str]:
     # 提取数组格式的图片 URL
     if isinstance(response.get("images"), list):
         urls.extend([item for item in response["images"] if isinstance(item, str) and item])
-    # 提取单个图片 URL
-    if isinstance(response.get("image_url"), str) and response["image_url"]:
-        urls.append(response["image_url"])
+    # 提取单个图片 URL（适配器通常将其设为 images[0]，已存在时不重复计入）
+    image_url = response.get("image_url")
+    if isinstance(image_url, str) and image_url and image_url not in urls:
+        urls.append(image_url)
     return urls
 
 
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Iterable, List
 
-from config.default import FUSION_WEIGHTS
+from config.default import FUSION_WEIGHTS, FUSION_WEIGHTS_VEC, MODULE_ORDER
+
+try:  # Optional dependency
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
+
+_FUSION_MODULES = frozenset(MODULE_ORDER)
 
 
 class FusionEngine:
@@ -33,3 +40,42 @@ class FusionEngine:
             return 0.0
 
         return round(weighted_sum / total_weight, 3)
+
+    def compute_batch(self, batch: Iterable[Dict[str, float]]) -> List[float]:
+        """批量计算综合分，结果与逐条调用 ``compute`` 一致。
+
+        仅包含标准融合模块的行会堆叠成矩阵，与权重向量做一次矩阵乘法；
+        命中色彩主分或含未知模块的行退回逐条计算。
+        """
+        rows = list(batch)
+        if _np is None or FUSION_WEIGHTS_VEC is None:
+            return [self.compute(row) for row in rows]
+
+        results: List[float] = [0.0] * len(rows)
+        vector_rows: List[int] = []
+        for index, row in enumerate(rows):
+            if not row or row.get("color_score") is not None or not _FUSION_MODULES.issuperset(row):
+                results[index] = self.compute(row)
+            else:
+                vector_rows.append(index)
+
+        if not vector_rows:
+            return results
+
+        shape = (len(vector_rows), len(MODULE_ORDER))
+        scores = _np.zeros(shape, dtype=_np.float64)
+        present = _np.zeros(shape, dtype=_np.float64)
+        for row_pos, index in enumerate(vector_rows):
+            row = rows[index]
+            for col, module in enumerate(MODULE_ORDER):
+                value = row.get(module)
+                if value is not None:
+                    scores[row_pos, col] = value
+                    present[row_pos, col] = 1.0
+
+        weighted_sum = scores @ FUSION_WEIGHTS_VEC
+        total_weight = present @ FUSION_WEIGHTS_VEC
+        for row_pos, index in enumerate(vector_rows):
+            total = float(total_weight[row_pos])
+            results[index] = round(float(weighted_sum[row_pos]) / total, 3) if total else 0.0
+        return results
@@ -12,6 +12,7 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from services.common.http import get_http_client
 from services.common.models import GeneratedImage
 
 logger = logging.getLogger(__name__)
@@ -370,8 +371,9 @@ class DoubaoAestheticClient:
                 delay = self._backoff_base * attempt + random.uniform(0, self._backoff_jitter)
                 await asyncio.sleep(delay)
             try:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    response = await client.post(self._api_url, json=payload, headers=headers)
+                response = await get_http_client().post(
+                    self._api_url, json=payload, headers=headers, timeout=self._timeout
+                )
                 response.raise_for_status()
                 body = response.json()
                 error_message = self._extract_error_message(body)
@@ -7,8 +7,7 @@ from typing import Optional, Tuple
 from urllib.parse import urlparse
 from uuid import UUID
 
-import httpx
-
+from services.common.http import get_http_client
 from services.common.models import GeneratedImage
 from services.scoring.base import ScoreService
 
@@ -52,12 +51,12 @@ class HolisticScoreService(ScoreService):
             if self._api_token:
                 headers["Authorization"] = f"Bearer {self._api_token}"
 
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = await client.post(
-                    self._api_url,
-                    files={"file": payload},
-                    headers=headers or None,
-                )
+            response = await get_http_client().post(
+                self._api_url,
+                files={"file": payload},
+                headers=headers or None,
+                timeout=self._timeout,
+            )
             response.raise_for_status()
             score = self._extract_score(response.json())
             if score is None:
@@ -82,8 +81,7 @@ class HolisticScoreService(ScoreService):
         if not parsed.scheme or not parsed.netloc:
             return None
 
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            response = await client.get(image_url)
+        response = await get_http_client().get(image_url, timeout=self._timeout)
         response.raise_for_status()
         filename = os.path.basename(parsed.path) or "image"
         return (filename, response.content, response.headers.get("content-type", content_type))
@@ -9,6 +9,7 @@ import base64
 import io
 import logging
 import re
+from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -186,7 +187,6 @@ class SegmentationService:
 
         # 确定输出路径
         if output_path is None:
-            from pathlib import Path
             p = Path(file_path)
             output_path = str(p.parent / f"{p.stem}_nobg.png")
 
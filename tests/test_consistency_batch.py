@@ -0,0 +1,75 @@
+import sys
+import os
+
+import orjson
+
+# --- 关键修复: 自动将项目根目录加入路径 ---
+# 获取当前脚本所在目录的上一级目录 (即项目根目录)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# -------------------------------------
+
+from services.pipeline.image2image import _extract_consistency_scores_batch
+
+
+def _chat_response(content):
+    """构造豆包 Chat Completion 格式的响应"""
+    return {"choices": [{"message": {"content": orjson.dumps(content).decode()}}]}
+
+
+def test_scores_follow_explicit_index():
+    """按 index 字段归位，与返回顺序无关"""
+    payload = _chat_response(
+        {
+            "scores": [
+                {"index": 2, "score": 0.2, "comment": "c"},
+                {"index": 0, "score": 0.9, "comment": "a"},
+                {"index": 1, "score": 0.5, "comment": "b"},
+            ]
+        }
+    )
+    assert _extract_consistency_scores_batch(payload, 3) == [0.9, 0.5, 0.2]
+
+
+def test_entries_without_index_use_position():
+    """缺少 index 或直接给出数值时按出现位置对应"""
+    payload = _chat_response({"scores": [{"score": 0.4}, 0.6]})
+    assert _extract_consistency_scores_batch(payload, 2) == [0.4, 0.6]
+
+
+def test_percent_scores_are_normalized():
+    """百分制归一化到 [0, 1]，超过 100 或小于 0 的值截断"""
+    payload = _chat_response(
+        {
+            "scores": [
+                {"index": 0, "score": 85},
+                {"index": 1, "score": "70"},
+                {"index": 2, "score": 250},
+                {"index": 3, "score": -0.3},
+            ]
+        }
+    )
+    assert _extract_consistency_scores_batch(payload, 4) == [0.85, 0.7, 1.0, 0.0]
+
+
+def test_missing_and_out_of_range_entries_are_none():
+    """缺失、越界或无法解析的项保持为 None"""
+    payload = _chat_response(
+        {
+            "scores": [
+                {"index": 0, "score": 0.8},
+                {"index": 3, "score": 0.9},
+                {"index": -1, "score": 0.7},
+                {"index": "1", "score": 0.6},
+                {"index": 2, "score": "无"},
+            ]
+        }
+    )
+    assert _extract_consistency_scores_batch(payload, 3) == [0.8, None, None]
+
+
+def test_unparseable_response_returns_all_none():
+    """响应中没有 scores 列表时全部为 None，交由逐张检查补齐"""
+    assert _extract_consistency_scores_batch(_chat_response({"score": 0.9}), 2) == [None, None]
+    assert _extract_consistency_scores_batch({"choices": []}, 2) == [None, None]
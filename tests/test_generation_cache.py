@@ -0,0 +1,125 @@
+import sys
+import os
+import asyncio
+
+import pytest
+
+# --- 关键修复: 自动将项目根目录加入路径 ---
+# 获取当前脚本所在目录的上一级目录 (即项目根目录)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# -------------------------------------
+
+from services.generate.adapters import _cache
+
+# ==========================================
+# Fixtures (测试数据准备)
+# ==========================================
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """每个用例前后清空缓存与进行中的请求"""
+    _cache.clear()
+    _cache._inflight.clear()
+    yield
+    _cache.clear()
+    _cache._inflight.clear()
+
+
+def make_producer(calls, *, delay=0.0, error=None):
+    """返回记录调用次数的生成函数"""
+    async def producer():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return {
+            "status": "success",
+            "images": ["http://img/1"],
+            "metadata": {"model": "m", "usage": {"tokens": 1}},
+        }
+    return producer
+
+# ==========================================
+# 测试用例
+# ==========================================
+
+@pytest.mark.asyncio
+async def test_hit_within_ttl_reuses_result():
+    calls = []
+    producer = make_producer(calls)
+    first = await _cache.cached("k", 60.0, producer)
+    second = await _cache.cached("k", 60.0, producer)
+    assert first == second
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_regenerated(monkeypatch):
+    calls = []
+    producer = make_producer(calls)
+    now = [1000.0]
+    monkeypatch.setattr(_cache.time, "monotonic", lambda: now[0])
+    await _cache.cached("k", 10.0, producer)
+    now[0] += 5.0
+    await _cache.cached("k", 10.0, producer)
+    assert len(calls) == 1
+    now[0] += 6.0
+    await _cache.cached("k", 10.0, producer)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_are_coalesced():
+    calls = []
+    producer = make_producer(calls, delay=0.05)
+    results = await asyncio.gather(*(_cache.cached("k", 60.0, producer) for _ in range(5)))
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert "k" not in _cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_callers_receive_independent_copies():
+    calls = []
+    producer = make_producer(calls, delay=0.01)
+    first, second = await asyncio.gather(
+        _cache.cached("k", 60.0, producer),
+        _cache.cached("k", 60.0, producer),
+    )
+    first["images"].append("http://img/2")
+    first["metadata"]["model"] = "changed"
+    first["metadata"]["usage"]["tokens"] = 99
+    third = await _cache.cached("k", 60.0, producer)
+    for result in (second, third):
+        assert result["images"] == ["http://img/1"]
+        assert result["metadata"] == {"model": "m", "usage": {"tokens": 1}}
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_not_cached():
+    calls = []
+    failing = make_producer(calls, delay=0.01, error=RuntimeError("boom"))
+    results = await asyncio.gather(
+        _cache.cached("k", 60.0, failing),
+        _cache.cached("k", 60.0, failing),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 1
+    assert "k" not in _cache._inflight
+    assert "k" not in _cache._entries
+
+    result = await _cache.cached("k", 60.0, make_producer(calls))
+    assert result["status"] == "success"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_should_cache_rejects_placeholder():
+    calls = []
+    producer = make_producer(calls)
+    await _cache.cached("k", 60.0, producer, should_cache=lambda value: False)
+    await _cache.cached("k", 60.0, producer, should_cache=lambda value: False)
+    assert len(calls) == 2